@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
-import inquirer
-from middleware.amazon_q_hook import AmazonQDeveloperHook
+from middleware.analysis_registry import ANALYSES, LANGUAGE_NAMES, get_analysis
+from middleware.progress_server import ProgressServer, ProgressReporter
+import argparse
 import json
 import sys
 import os
@@ -9,10 +10,14 @@ from datetime import datetime
 
 
 class ArchiQCLI:
-    def __init__(self):
-        self.q_hook = AmazonQDeveloperHook()
+    def __init__(self, progress_server=None, transport='pipe', question_timeout=None):
+        self._q_hook = None  # Created on first analysis
+        self.transport = transport  # qchat transport: 'pipe' or 'pty'
+        self.question_timeout = question_timeout  # Seconds before a question is interrupted (None: no limit)
+        self.progress_server = progress_server  # Optional WebSocket progress broadcaster
         self.default_region = 'ap-northeast-2'  # Seoul region as default
         self.language = 'ko'  # Default language
+        self.bilingual = False  # Also produce the report in the other language from the same run
         
         # Get terminal size for better formatting
         self.terminal_width = shutil.get_terminal_size().columns
@@ -25,60 +30,57 @@ class ArchiQCLI:
                 'subtitle': 'AWS 아키텍처를 분석하고 개선 방안을 제시합니다',
                 'language_select': '언어를 선택하세요 (Select Language):',
                 'menu_select': '원하는 기능을 선택하세요:',
-                'menu_options': [
-                    ('1. 사용중인 AWS 리소스 기반 현대화 경로 분석', 'modernization_path'),
-                    ('2. 사용중인 AWS 리소스 기반 보안 점검', 'security_check'),
-                    ('3. 사용중인 AWS 리소스 기반 Well-Architected 리뷰', 'well_architected'),
-                    ('4. 사용중인 AWS 리소스 기반 아키텍처 다이어그램 생성', 'architecture_diagram'),
-                    ('5. Service Screener 결과 기반 Well-Architected Review', 'service_screener'),
-                    ('6. 종료', 'exit')
-                ],
                 'region_input': 'AWS 리전을 입력하세요 (기본값: {}):',
                 'directory_input': 'Service Screener 결과가 있는 디렉토리 경로를 입력하세요:',
                 'processing': '{} 리전의 AWS 리소스를 기반으로 {}을(를) 수행합니다...',
+                'processing_directory': '{}의 Service Screener 결과를 기반으로 {}를 수행합니다...',
+                'change_language': '언어 변경 (Change Language)',
+                'exit': '종료',
                 'goodbye': '감사합니다! 안녕히 가세요! 👋',
                 'exit_msg': '프로그램을 종료합니다! 👋',
                 'continue_msg': '계속하려면 Enter를 누르세요...',
                 'menu_return': '메뉴로 돌아가려면 Enter를 누르세요...',
                 'error': '오류 발생: {}',
                 'interrupted': '사용자에 의해 중단되었습니다.',
+                'timed_out': '제한 시간({:.0f}초)을 초과하여 중단되었습니다. 세션은 유지됩니다.',
                 'connecting': 'Amazon Q Developer에 연결 중...',
                 'processing_question': '질문 처리 중: {}...',
                 'progress': '진행상황: {}줄 ({}자) | 경과시간: {:.1f}초',
-                'completed': '{} 완료! | 총 {}줄 ({}자) | 소요시간: {:.1f}초'
+                'completed': '{} 완료! | 총 {}줄 ({}자) | 소요시간: {:.1f}초',
+                'translating': '보고서를 {}로 번역 중... (AWS 재분석 없음)',
+                'translated': '번역본 저장 완료: {}',
+                'translation_skipped': '생성된 보고서 파일을 찾지 못해 번역을 건너뜁니다.',
+                'translation_missing': '번역본 파일이 생성되지 않았습니다: {}'
             },
             'en': {
                 'title': '🏗️  ArchiQ - AWS Architecture Review Tool',
                 'subtitle': 'Analyze AWS architecture and provide improvement recommendations',
                 'language_select': '언어를 선택하세요 (Select Language):',
                 'menu_select': 'Please select the desired function:',
-                'menu_options': [
-                    ('1. AWS Resource-based Modernization Path Analysis', 'modernization_path'),
-                    ('2. AWS Resource-based Security Assessment', 'security_check'),
-                    ('3. AWS Resource-based Well-Architected Review', 'well_architected'),
-                    ('4. AWS Resource-based Architecture Diagram Generation', 'architecture_diagram'),
-                    ('5. Service Screener Results-based Well-Architected Review', 'service_screener'),
-                    ('6. Exit', 'exit')
-                ],
                 'region_input': 'Enter AWS region (default: {}):',
                 'directory_input': 'Enter the directory path containing Service Screener results:',
-                'processing': 'Performing {} based on AWS resources in {} region...',
+                'processing': 'Performing {1} based on AWS resources in {0} region...',
+                'processing_directory': 'Performing {1} based on Service Screener results in {0}...',
+                'change_language': '언어 변경 (Change Language)',
+                'exit': 'Exit',
                 'goodbye': 'Thank you! Goodbye! 👋',
                 'exit_msg': 'Exiting program! 👋',
                 'continue_msg': 'Press Enter to continue...',
                 'menu_return': 'Press Enter to return to menu...',
                 'error': 'Error occurred: {}',
                 'interrupted': 'Interrupted by user.',
+                'timed_out': 'Stopped after exceeding the {:.0f}s time limit. The session is kept.',
                 'connecting': 'Connecting to Amazon Q Developer...',
                 'processing_question': 'Processing question: {}...',
                 'progress': 'Progress: {} lines ({} chars) | Elapsed: {:.1f}s',
-                'completed': '{} completed! | Total {} lines ({} chars) | Duration: {:.1f}s'
+                'completed': '{} completed! | Total {} lines ({} chars) | Duration: {:.1f}s',
+                'translating': 'Translating report to {}... (no AWS re-analysis)',
+                'translated': 'Translated report saved: {}',
+                'translation_skipped': 'No generated report file was found, skipping translation.',
+                'translation_missing': 'Translated report was not written: {}'
             }
         }
 
-        # Load prompts for core functions only
-        self.prompts = self._load_prompts()
-
     def _clear_screen(self):
         """Clear screen and reset cursor position"""
         os.system('clear' if os.name == 'posix' else 'cls')
@@ -101,34 +103,13 @@ class ArchiQCLI:
         import textwrap
         return textwrap.fill(text, width=width)
 
-    def _load_prompts(self):
-        """Load core prompt templates based on selected language"""
-        prompts = {}
-        prompt_files = {
-            'modernization_path': 'modernization_path.md',
-            'service_screener_review': 'service_screener_review.md',
-            'security_check': 'security_check.md',
-            'well_architected_review': 'well_architected_review.md',
-            'architecture_diagram': 'architecture_diagram.md'
-        }
-
-        # Determine prompt directory based on language
-        prompt_dir = f'src/prompt/{self.language}' if self.language == 'en' else 'src/prompt'
-
-        for key, filename in prompt_files.items():
-            try:
-                with open(f'{prompt_dir}/{filename}', 'r', encoding='utf-8') as f:
-                    prompts[key] = f.read()
-            except FileNotFoundError:
-                # Fallback to Korean version if English not found
-                try:
-                    with open(f'src/prompt/{filename}', 'r', encoding='utf-8') as f:
-                        prompts[key] = f.read()
-                except FileNotFoundError:
-                    print(f"Warning: Prompt file {filename} not found")
-                    prompts[key] = ""
-
-        return prompts
+    @property
+    def q_hook(self):
+        """Amazon Q hook, created lazily so the menu appears without delay"""
+        if self._q_hook is None:
+            from middleware.amazon_q_hook import AmazonQDeveloperHook
+            self._q_hook = AmazonQDeveloperHook(transport=self.transport)
+        return self._q_hook
 
     def _get_text(self, key):
         """Get localized text"""
@@ -136,36 +117,48 @@ class ArchiQCLI:
 
     def _select_language(self):
         """Language selection menu"""
+        import inquirer
+
         questions = [
             inquirer.List('language',
                           message=self._get_text('language_select'),
                           choices=[
                               ('한국어 (Korean)', 'ko'),
-                              ('English', 'en')
+                              ('English', 'en'),
+                              ('한국어 + English (이중 언어 보고서 / Bilingual reports)', 'ko+en')
                           ])
         ]
         
         answers = inquirer.prompt(questions)
         if answers:
-            self.language = answers['language']
-            # Reload prompts with new language
-            self.prompts = self._load_prompts()
-
-    def modernization_path_review(self):
-        """Perform modernization path analysis based on AWS resources"""
-        region = self._get_region_input()
+            self.bilingual = answers['language'] == 'ko+en'
+            self.language = 'ko' if self.bilingual else answers['language']
+
+    def run_analysis(self, key):
+        """Run a registered analysis after asking for its input"""
+        spec = get_analysis(key)
+
+        if spec.input_kind == 'directory':
+            directory_path = self._get_directory_input()
+            if not directory_path:
+                return
+            values = {'DIR_PATH': directory_path}
+            print(f"\n{self._get_text('processing_directory').format(directory_path, spec.name(self.language))}\n")
+        else:
+            region = self._get_region_input()
+            values = {'REGION': region}
+            print(f"\n{self._get_text('processing').format(region, spec.name(self.language))}\n")
+
+        title = spec.title(self.language, **values)
+        report_path = spec.report_path(self.language, **values)
+        os.makedirs(os.path.dirname(report_path), exist_ok=True)
+        question = spec.build_question(self.language, REPORT_PATH=report_path, **values)
+        self._execute_review(question, title, spec, report_path)
+
+    def _get_directory_input(self):
+        """Get Service Screener results directory from user"""
+        import inquirer
 
-        analysis_type = "현대화 경로 분석" if self.language == 'ko' else "modernization path analysis"
-        print(f"\n{self._get_text('processing').format(region, analysis_type)}\n")
-
-        # Construct question with prompt template
-        question = self.prompts['modernization_path'].replace("{REGION}", region)
-
-        title = f"{region} 리전 현대화 경로 분석 보고서" if self.language == 'ko' else f"{region} Region Modernization Path Analysis Report"
-        self._execute_review(question, title)
-
-    def service_screener_review(self):
-        """Perform Well-Architected Review based on Service Screener Results"""
         questions = [
             inquirer.Path('directory',
                           message=self._get_text('directory_input'),
@@ -174,59 +167,12 @@ class ArchiQCLI:
                           exists=True)
         ]
         answers = inquirer.prompt(questions)
-
-        if answers:
-            directory_path = answers['directory']
-            analysis_type = "Service Screener 기반 Well-Architected Review" if self.language == 'ko' else "Service Screener-based Well-Architected Review"
-            print(f"\n{directory_path}의 Service Screener 결과를 기반으로 {analysis_type}를 수행합니다...\n")
-
-            # Construct question with prompt template
-            question = self.prompts['service_screener_review'].replace("{DIR_PATH}", directory_path)
-
-            title = "Service Screener 기반 Well-Architected Review" if self.language == 'ko' else "Service Screener-based Well-Architected Review"
-            self._execute_review(question, title)
-
-    def security_check_review(self):
-        """Perform security check based on AWS resources"""
-        region = self._get_region_input()
-
-        analysis_type = "보안 점검" if self.language == 'ko' else "security assessment"
-        print(f"\n{self._get_text('processing').format(region, analysis_type)}\n")
-
-        # Construct question with prompt template
-        question = self.prompts['security_check'].replace("{REGION}", region)
-
-        title = f"{region} 리전 보안 점검 보고서" if self.language == 'ko' else f"{region} Region Security Assessment Report"
-        self._execute_review(question, title)
-
-    def well_architected_review(self):
-        """Perform Well-Architected review based on AWS resources"""
-        region = self._get_region_input()
-
-        analysis_type = "Well-Architected 리뷰" if self.language == 'ko' else "Well-Architected review"
-        print(f"\n{self._get_text('processing').format(region, analysis_type)}\n")
-
-        # Construct question with prompt template
-        question = self.prompts['well_architected_review'].replace("{REGION}", region)
-
-        title = f"{region} 리전 Well-Architected 리뷰 보고서" if self.language == 'ko' else f"{region} Region Well-Architected Review Report"
-        self._execute_review(question, title)
-
-    def architecture_diagram_review(self):
-        """Generate architecture diagram using draw.io format"""
-        region = self._get_region_input()
-
-        analysis_type = "아키텍처 다이어그램 생성" if self.language == 'ko' else "architecture diagram generation"
-        print(f"\n{self._get_text('processing').format(region, analysis_type)}\n")
-
-        # Construct question with prompt template
-        question = self.prompts['architecture_diagram'].replace("{REGION}", region)
-        
-        title = f"{region} 리전 아키텍처 다이어그램" if self.language == 'ko' else f"{region} Region Architecture Diagram"
-        self._execute_review(question, title)
+        return answers['directory'] if answers else None
 
     def _get_region_input(self):
         """Get AWS region input from user"""
+        import inquirer
+
         questions = [
             inquirer.Text('region',
                           message=self._get_text('region_input').format(self.default_region),
@@ -235,13 +181,16 @@ class ArchiQCLI:
         answers = inquirer.prompt(questions)
         return answers['region'] if answers else self.default_region
 
-    def _execute_review(self, question, title):
+    def _execute_review(self, question, title, spec=None, report_path=None):
         """Execute review and save results - enhanced with better formatting and progress tracking"""
+        from middleware.amazon_q_hook import QuestionTimeout
+
         self._clear_screen()
         self._print_header(title)
         
         full_response = ""
         start_time = datetime.now()
+        reporter = ProgressReporter(self.progress_server, title)
         
         try:
             line_count = 0
@@ -251,12 +200,13 @@ class ArchiQCLI:
             print(f"📡 {self._get_text('connecting')}")
             print(f"💭 {self._get_text('processing_question').format(question[:100])}")
             self._print_separator()
+            reporter.phase('connecting', language=self.language)
             
             # Buffer for collecting output
             output_buffer = []
             buffer_size = 50  # Lines to buffer before displaying
             
-            for line in self.q_hook.ask_question_stream(question):
+            for line in self.q_hook.ask_question_stream(question, timeout=self.question_timeout):
                 current_time = datetime.now()
                 elapsed = (current_time - start_time).total_seconds()
                 
@@ -264,6 +214,10 @@ class ArchiQCLI:
                 clean_line = line.strip()
                 if not clean_line:
                     continue
+
+                if line_count == 0:
+                    reporter.phase('streaming')
+                reporter.line(clean_line, line_count + 1)
                 
                 # Wrap long lines to fit terminal
                 wrapped_lines = self._wrap_text(clean_line).split('\n')
@@ -287,6 +241,7 @@ class ArchiQCLI:
                         progress_msg = f"📊 {self._get_text('progress').format(line_count, f'{char_count:,}', elapsed)}"
                         print(self._wrap_text(progress_msg))
                         self._print_separator("·")
+                        reporter.progress(line_count, char_count, elapsed)
                         last_progress_time = current_time
             
             # Display remaining buffer
@@ -295,25 +250,84 @@ class ArchiQCLI:
             
         except KeyboardInterrupt:
             print(f"\n⚠️ {self._get_text('interrupted')}")
+            reporter.error('interrupted')
+            # Stop the generation but keep the warm session for the next analysis
+            self.q_hook.interrupt()
+            input(f"\n{self._get_text('continue_msg')}")
+            return
+        except QuestionTimeout:
+            print(f"\n⏹️ {self._get_text('timed_out').format(self.question_timeout)}")
+            reporter.error('timeout')
             input(f"\n{self._get_text('continue_msg')}")
             return
         except Exception as e:
             print(f"\n❌ {self._get_text('error').format(str(e))}")
+            reporter.error(str(e))
             retry_msg = "🔄 잠시 후 다시 시도해주세요." if self.language == 'ko' else "🔄 Please try again later."
             print(retry_msg)
             input(f"\n{self._get_text('continue_msg')}")
             return
 
         total_time = (datetime.now() - start_time).total_seconds()
+        if report_path and not os.path.exists(report_path):
+            report_path = None
+        reporter.completed(line_count, char_count, total_time, report_path)
         
         self._print_separator()
         completion_msg = f"✅ {self._get_text('completed').format(title, line_count, f'{char_count:,}', total_time)}"
         print(self._wrap_text(completion_msg))
         self._print_separator()
+
+        if self.bilingual and spec:
+            self._translate_report(spec, report_path, reporter)
         
         # Pause before returning to menu
         input(f"\n{self._get_text('menu_return')}")
 
+    def watch_service_screener(self, directory):
+        """Follow a Service Screener results directory, re-analyzing only services whose files changed"""
+        from middleware.screener_watcher import ServiceScreenerWatcher
+
+        watcher = ServiceScreenerWatcher(self.q_hook, directory, self.language,
+                                         question_timeout=self.question_timeout)
+        try:
+            watcher.run()
+        except KeyboardInterrupt:
+            print(f"\n{self._get_text('exit_msg')}")
+        finally:
+            self.q_hook.end_interactive_session_with_tools()
+
+    def _translate_report(self, spec, report_path, reporter):
+        """Produce the other-language report from the finished one, without re-running the analysis"""
+        if not report_path:
+            print(f"⚠️ {self._get_text('translation_skipped')}")
+            return
+
+        target_language = 'en' if self.language == 'ko' else 'ko'
+        question, target_path = spec.translation_question(report_path, target_language)
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+
+        print(f"🌐 {self._get_text('translating').format(LANGUAGE_NAMES[target_language])}")
+        reporter.phase('translating', target_language=target_language)
+        try:
+            for _ in self.q_hook.ask_question_stream(question, timeout=self.question_timeout):
+                pass
+        except KeyboardInterrupt:
+            print(f"\n⚠️ {self._get_text('interrupted')}")
+            reporter.error('interrupted')
+            self.q_hook.interrupt()
+            return
+        except Exception as e:
+            print(f"\n❌ {self._get_text('error').format(str(e))}")
+            reporter.error(str(e))
+            return
+
+        if os.path.exists(target_path):
+            print(f"✅ {self._get_text('translated').format(target_path)}")
+            reporter.phase('translated', report_path=target_path)
+        else:
+            print(f"⚠️ {self._get_text('translation_missing').format(target_path)}")
+
     def _get_filename(self, title):
         """Generate filename from title"""
         # Remove special characters and replace spaces with underscores
@@ -325,6 +339,8 @@ class ArchiQCLI:
 
     def main_menu(self):
         """Display the main menu and handle user input"""
+        import inquirer
+
         # First, select language
         self._clear_screen()
         self._select_language()
@@ -340,13 +356,17 @@ class ArchiQCLI:
             
             # Show current language in menu
             lang_display = "한국어" if self.language == 'ko' else "English"
+            if self.bilingual:
+                lang_display = "한국어 + English"
             print(f"Language: {lang_display}".center(self.max_width))
             print("-" * self.max_width)
             
-            menu_options = self._get_text('menu_options').copy()
-            # Add language change option
-            lang_change_text = "언어 변경 (Change Language)" if self.language == 'ko' else "언어 변경 (Change Language)"
-            menu_options.insert(-1, (f"7. {lang_change_text}", 'change_language'))
+            menu_options = [
+                (f"{number}. {spec.menu.get(self.language, spec.key)}", spec.key)
+                for number, spec in enumerate(ANALYSES.values(), start=1)
+            ]
+            menu_options.append((f"{len(menu_options) + 1}. {self._get_text('change_language')}", 'change_language'))
+            menu_options.append((f"{len(menu_options) + 1}. {self._get_text('exit')}", 'exit'))
             
             questions = [
                 inquirer.List('action',
@@ -360,16 +380,8 @@ class ArchiQCLI:
                 if not answers:
                     break
 
-                if answers['action'] == 'modernization_path':
-                    self.modernization_path_review()
-                elif answers['action'] == 'security_check':
-                    self.security_check_review()
-                elif answers['action'] == 'well_architected':
-                    self.well_architected_review()
-                elif answers['action'] == 'architecture_diagram':
-                    self.architecture_diagram_review()
-                elif answers['action'] == 'service_screener':
-                    self.service_screener_review()
+                if answers['action'] in ANALYSES:
+                    self.run_analysis(answers['action'])
                 elif answers['action'] == 'change_language':
                     self._select_language()
                 elif answers['action'] == 'exit':
@@ -389,8 +401,40 @@ class ArchiQCLI:
                 continue
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description='ArchiQ - AWS Architecture Review Tool')
+    parser.add_argument('--progress-port', type=int, default=None,
+                        help='Broadcast run progress over WebSocket on this port')
+    parser.add_argument('--progress-host', default='127.0.0.1',
+                        help='Bind address for the progress server (default: 127.0.0.1; '
+                             'use 0.0.0.0 to let other machines subscribe)')
+    parser.add_argument('--transport', choices=['pipe', 'pty'], default='pipe',
+                        help='How to talk to qchat: plain pipes or a pseudo-terminal (default: pipe)')
+    parser.add_argument('--question-timeout', type=float, default=None,
+                        help='Interrupt a question after this many seconds, keeping the session (default: no limit)')
+    parser.add_argument('--watch-screener', metavar='DIR', default=None,
+                        help='Watch a Service Screener results directory and keep its review up to date')
+    parser.add_argument('--language', choices=['ko', 'en'], default='ko',
+                        help='Report language for --watch-screener (default: ko)')
+    return parser.parse_args()
+
+
 def main():
-    cli = ArchiQCLI()
+    args = parse_args()
+
+    progress_server = None
+    if args.progress_port:
+        progress_server = ProgressServer(args.progress_host, args.progress_port)
+        if not progress_server.start():
+            progress_server = None
+
+    cli = ArchiQCLI(progress_server=progress_server, transport=args.transport,
+                    question_timeout=args.question_timeout)
+    if args.watch_screener:
+        cli.language = args.language
+        cli.watch_service_screener(args.watch_screener)
+        sys.exit(0)
+
     try:
         cli.main_menu()
     except KeyboardInterrupt:
@@ -401,7 +445,10 @@ def main():
         error_msg = f"오류가 발생했습니다: {str(e)}" if cli.language == 'ko' else f"An error occurred: {str(e)}"
         print(f"\n{error_msg}")
         sys.exit(1)
+    finally:
+        if progress_server:
+            progress_server.stop()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from middleware.amazon_q_hook import QuestionCancelled, QuestionTimeout
+from middleware.analysis_registry import get_analysis
+from middleware.aws_rate_limiter import get_rate_controller
+from middleware.inventory import InventoryCollector, find_recent_snapshot, summarize_inventory
+from middleware.metrics import MetricsCollector
+from middleware.job_queue import JobQueue
+from middleware.session_pool import QChatSessionPool
+from middleware.progress_server import ProgressServer, ProgressReporter
+from middleware.scheduler import AnalysisScheduler
+
+
+class ArchiQDaemon:
+    """
+    Long-running job runner that schedules analyses onto a shared qchat session pool
+    """
+
+    def __init__(self, workers=2, progress_server=None, transport='pipe', job_timeout=None):
+        self.jobs = JobQueue()
+        self.job_timeout = job_timeout  # Default per-question deadline in seconds
+        self.pool = QChatSessionPool(max_sessions=workers, transport=transport)
+        self.workers = workers
+        self.progress_server = progress_server
+        self.worker_threads = []
+        self.is_running = False
+        self.metrics_cache = OrderedDict()  # snapshot path -> utilization prompt text, least recently used first
+        self.metrics_locks = {}  # snapshot path -> lock held while its metrics are being collected
+        self.metrics_lock = threading.Lock()  # Guards the two dicts only, never held while collecting
+        self.max_cached_metrics = 32
+
+    def start(self):
+        """Start worker threads"""
+        self.is_running = True
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f'archiq-worker-{index}', daemon=True)
+            thread.start()
+            self.worker_threads.append(thread)
+        print(f"[INFO] 🚀 ArchiQ daemon started with {self.workers} workers")
+
+    def stop(self):
+        """Stop workers and terminate pooled sessions"""
+        self.is_running = False
+        for thread in self.worker_threads:
+            thread.join(timeout=2)
+        self.pool.close()
+        get_rate_controller().print_report()
+        print("[INFO] 🛑 ArchiQ daemon stopped")
+
+    def submit(self, request):
+        """Validate a job request and queue it (merging identical in-flight requests)"""
+        analysis = request.get('analysis')
+        spec = get_analysis(analysis)
+
+        language = request.get('language', 'ko')
+        if language not in ('ko', 'en'):
+            raise ValueError(f"Unsupported language: {language}")
+
+        directory = request.get('directory')
+        if spec.input_kind == 'directory' and not directory:
+            raise ValueError(f"'directory' is required for {analysis}")
+
+        timeout = request.get('timeout', self.job_timeout)
+        if timeout is not None:
+            timeout = float(timeout)
+            if timeout <= 0:
+                raise ValueError("'timeout' must be a positive number of seconds")
+
+        params = {
+            'analysis': analysis,
+            'region': request.get('region', 'ap-northeast-2'),
+            'language': language,
+            'account': request.get('account'),
+            'directory': directory,
+            'context': request.get('context'),  # Extra instructions appended to the prompt
+            'inventory': bool(request.get('inventory')),  # Attach a collected resource inventory
+            'bilingual': bool(request.get('bilingual')),  # Also translate the report to the other language
+            'timeout': timeout,  # Per-question deadline; not part of the dedup key
+        }
+        key = tuple(params[name] for name in
+                    ('analysis', 'region', 'language', 'account', 'directory', 'context', 'inventory', 'bilingual'))
+        return self.jobs.submit(key, params, int(request.get('priority', 0)))
+
+    def question_for(self, params, report_path='{REPORT_PATH}'):
+        """Build the full question for job parameters"""
+        spec = get_analysis(params['analysis'])
+        if spec.input_kind == 'directory':
+            values = {'DIR_PATH': params.get('directory') or ''}
+        else:
+            values = {'REGION': params.get('region', 'ap-northeast-2')}
+        values['REPORT_PATH'] = report_path
+
+        question = spec.build_question(params.get('language', 'ko'), **values)
+        if params.get('context'):
+            question = f"{question}\n\n{params['context']}"
+        return question
+
+    def inventory_context(self, params):
+        """Summarize the analysis' slice of a recent (or freshly collected) inventory snapshot"""
+        spec = get_analysis(params['analysis'])
+        if not params.get('inventory') or not spec.resource_types:
+            return None
+
+        snapshot = find_recent_snapshot(params['region'], params.get('account'))
+        if not snapshot:
+            snapshot = InventoryCollector(params['region'], params.get('account')).collect()
+        context = summarize_inventory(snapshot, spec.resource_types)
+
+        if spec.metrics:
+            context = f"{context}\n\n{self.utilization_for(params, snapshot)}"
+        return context
+
+    def utilization_for(self, params, snapshot):
+        """CloudWatch utilization text for a snapshot, collected once even when several jobs ask at the same time"""
+        with self.metrics_lock:
+            utilization = self.metrics_cache.get(snapshot)
+            if utilization is not None:
+                self.metrics_cache.move_to_end(snapshot)
+                return utilization
+            snapshot_lock = self.metrics_locks.setdefault(snapshot, threading.Lock())
+
+        # Only jobs for the same snapshot wait here; other accounts and regions collect in parallel
+        with snapshot_lock:
+            with self.metrics_lock:
+                utilization = self.metrics_cache.get(snapshot)
+            if utilization is not None:
+                return utilization
+
+            try:
+                metrics = MetricsCollector(params['region'], params.get('account')).collect(snapshot)
+                utilization = metrics.to_prompt()
+                with self.metrics_lock:
+                    self.metrics_cache[snapshot] = utilization
+                    while len(self.metrics_cache) > self.max_cached_metrics:
+                        self.metrics_cache.popitem(last=False)
+            finally:
+                with self.metrics_lock:
+                    self.metrics_locks.pop(snapshot, None)
+            return utilization
+
+    def _translate(self, hook, spec, params, report_path, reporter, timeout=None):
+        """Translate the finished report on the same warm session, without re-running the analysis"""
+        target_language = 'en' if params['language'] == 'ko' else 'ko'
+        question, target_path = spec.translation_question(report_path, target_language)
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+
+        reporter.phase('translating', target_language=target_language)
+        for _ in hook.ask_question_stream(question, timeout=timeout):
+            pass
+        return target_path if os.path.exists(target_path) else None
+
+    def _worker(self):
+        """Run queued jobs in priority order"""
+        while self.is_running:
+            job = self.jobs.get(timeout=1.0)
+            if job:
+                self._run_job(job)
+
+    @staticmethod
+    def _check_cancelled(job):
+        """Stop between phases when the job was cancelled before its question started"""
+        if job.cancel_requested:
+            raise QuestionCancelled("Job cancelled")
+
+    def _run_job(self, job):
+        params = job.params
+        title = f"{params['analysis']} ({params['region']}, {params['language']})"
+        reporter = ProgressReporter(self.progress_server, title)
+        started = datetime.now().timestamp()
+        print(f"[INFO] ▶️ Running job {job.id}: {title}")
+
+        try:
+            spec = get_analysis(params['analysis'])
+            # Each job names its own report file, so concurrent jobs never pick up each other's output
+            report_path = spec.report_path(params['language'], job.id, REGION=params['region'])
+            os.makedirs(os.path.dirname(report_path), exist_ok=True)
+            question = self.question_for(params, report_path)
+            if params.get('inventory'):
+                reporter.phase('collecting', job_id=job.id)
+                inventory = self.inventory_context(params)
+                if inventory:
+                    question = f"{question}\n\n{inventory}"
+            self._check_cancelled(job)
+            reporter.phase('connecting', job_id=job.id)
+
+            lines = []
+            with self.pool.session(params['account']) as hook:
+                # A pooled hook may hold a stale cancel from its previous job. Clear it before exposing
+                # hook.cancel; a cancel that arrived before that is caught by _check_cancelled
+                hook.clear_cancel()
+                job.on_cancel = hook.cancel
+                try:
+                    self._check_cancelled(job)
+                    for line in hook.ask_question_stream(question, timeout=job.timeout):
+                        lines.append(line)
+                        reporter.line(line, len(lines))
+
+                    result = {
+                        'lines': len(lines),
+                        'output': "\n".join(lines),
+                        'report_path': report_path if os.path.exists(report_path) else None,
+                    }
+                    if params.get('bilingual') and result['report_path']:
+                        # The analysis is done: a failed translation must not discard its report
+                        try:
+                            self._check_cancelled(job)
+                            result['translated_report_path'] = self._translate(
+                                hook, spec, params, result['report_path'], reporter, job.timeout)
+                        except Exception as e:
+                            result['translation_error'] = str(e)
+                            print(f"[WARNING] Translation for job {job.id} failed: {e}")
+                finally:
+                    job.on_cancel = None  # The hook goes back to the pool for other jobs
+            elapsed = datetime.now().timestamp() - started
+            reporter.completed(len(lines), len(result['output']), elapsed, result['report_path'])
+            self.jobs.complete(job, result=result)
+            print(f"[INFO] ✅ Job {job.id} completed in {elapsed:.1f}s")
+
+        except QuestionCancelled as e:
+            status = 'failed' if isinstance(e, QuestionTimeout) else 'cancelled'
+            reporter.error(str(e))
+            self.jobs.complete(job, error=str(e), status=status)
+            print(f"[INFO] ⏹️ Job {job.id} {status}: {e}")
+
+        except Exception as e:
+            reporter.error(str(e))
+            self.jobs.complete(job, error=str(e))
+            print(f"[ERROR] ❌ Job {job.id} failed: {e}")
+
+
+def make_handler(daemon):
+    class JobRequestHandler(BaseHTTPRequestHandler):
+        """
+        JSON API: POST /jobs, GET /jobs, GET /jobs/<id>[?wait=<seconds>], DELETE /jobs/<id>, GET /stats
+        """
+
+        def _send_json(self, status, body):
+            payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_POST(self):
+            if urlparse(self.path).path.rstrip('/') != '/jobs':
+                return self._send_json(404, {'error': 'Not found'})
+
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                request = json.loads(self.rfile.read(length) or b'{}')
+                if not isinstance(request, dict):
+                    raise ValueError("Request body must be a JSON object")
+                job, deduplicated = daemon.submit(request)
+            except (ValueError, TypeError) as e:
+                return self._send_json(400, {'error': str(e)})
+
+            self._send_json(202, {'job_id': job.id, 'status': job.status, 'deduplicated': deduplicated})
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            parts = [part for part in url.path.split('/') if part]
+
+            if parts == ['stats']:
+                return self._send_json(200, {'aws_api': get_rate_controller().report()})
+
+            if parts == ['jobs']:
+                return self._send_json(200, {'jobs': [
+                    {'job_id': job.id, 'status': job.status, 'priority': job.priority, 'params': job.params}
+                    for job in daemon.jobs.list_jobs()
+                ]})
+
+            if len(parts) == 2 and parts[0] == 'jobs':
+                job = daemon.jobs.get_job(parts[1])
+                if not job:
+                    return self._send_json(404, {'error': 'Job not found'})
+
+                wait = parse_qs(url.query).get('wait')
+                if wait:
+                    try:
+                        timeout = float(wait[0])
+                        if not math.isfinite(timeout):
+                            raise ValueError(wait[0])
+                    except ValueError:
+                        return self._send_json(400, {'error': f"Invalid wait value: {wait[0]}"})
+                    job.wait(timeout=max(0.0, timeout))
+                return self._send_json(200, job.to_dict())
+
+            self._send_json(404, {'error': 'Not found'})
+
+        def do_DELETE(self):
+            parts = [part for part in urlparse(self.path).path.split('/') if part]
+            if len(parts) != 2 or parts[0] != 'jobs':
+                return self._send_json(404, {'error': 'Not found'})
+
+            job = daemon.jobs.cancel(parts[1])
+            if not job:
+                return self._send_json(404, {'error': 'Job not found'})
+            self._send_json(202, {'job_id': job.id, 'status': job.status, 'cancel_requested': job.cancel_requested,
+                                  'subscribers': job.subscribers})
+
+        def log_message(self, format, *args):
+            print(f"[HTTP] {self.address_string()} {format % args}")
+
+    return JobRequestHandler
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='ArchiQ daemon - queued analysis jobs over HTTP')
+    parser.add_argument('--host', default='127.0.0.1', help='Bind address (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8780, help='HTTP port (default: 8780)')
+    parser.add_argument('--workers', type=int, default=2, help='Concurrent qchat sessions (default: 2)')
+    parser.add_argument('--progress-port', type=int, default=None,
+                        help='Broadcast job progress over WebSocket on this port')
+    parser.add_argument('--transport', choices=['pipe', 'pty'], default='pipe',
+                        help='How to talk to qchat: plain pipes or a pseudo-terminal (default: pipe)')
+    parser.add_argument('--job-timeout', type=float, default=None,
+                        help='Default seconds a job question may run before it is interrupted')
+    parser.add_argument('--schedule', default=None,
+                        help='JSON file with recurring cron-style analysis schedules')
+    parser.add_argument('--state-file', default='.archiq/schedule_state.json',
+                        help='Where scheduled run state is kept between runs')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    progress_server = None
+    if args.progress_port:
+        progress_server = ProgressServer(args.host, args.progress_port)
+        if not progress_server.start():
+            progress_server = None
+
+    daemon = ArchiQDaemon(workers=args.workers, progress_server=progress_server, transport=args.transport,
+                          job_timeout=args.job_timeout)
+    daemon.start()
+
+    scheduler = None
+    if args.schedule:
+        scheduler = AnalysisScheduler.from_file(daemon, args.schedule, state_file=args.state_file)
+        scheduler.start()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(daemon))
+    print(f"[INFO] 🌐 Accepting jobs on http://{args.host}:{args.port}/jobs")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[INFO] Shutting down...")
+    finally:
+        server.server_close()
+        if scheduler:
+            scheduler.stop()
+        daemon.stop()
+        if progress_server:
+            progress_server.stop()
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,9 @@ import queue
 from typing import Dict, Any, Optional
 import re
 import itertools
+import codecs
+import select
+import signal
 
 
 class SpinnerManager:
@@ -59,35 +62,91 @@ class SpinnerManager:
                 break
 
 
+class QuestionCancelled(Exception):
+    """Raised when a question is cancelled; the session is left clean and reusable"""
+
+
+class QuestionTimeout(QuestionCancelled):
+    """Raised when a question runs past its deadline"""
+
+
+class IncrementalLineSplitter:
+    """
+    Split a byte stream into lines as chunks arrive, applying terminal \r redraws
+    """
+
+    def __init__(self):
+        self.decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self.pending = ""
+
+    def feed(self, data: bytes):
+        """Return the lines completed by this chunk"""
+        text = self.pending + self.decoder.decode(data)
+        *lines, self.pending = text.split('\n')
+        # A \r followed by more text redraws the line: only the text after the last one is visible.
+        # A trailing \r is kept, since it may be the first half of a \r\n split across reads.
+        if '\r' in self.pending:
+            text = self.pending.rstrip('\r')
+            self.pending = text.rsplit('\r', 1)[-1] + self.pending[len(text):]
+        return [self._visible(line) for line in lines]
+
+    def flush(self):
+        """Return whatever is left once the stream ends"""
+        text = self.pending + self.decoder.decode(b'', final=True)
+        self.pending = ""
+        return [self._visible(text)] if text else []
+
+    def _visible(self, line):
+        if '\r' in line:
+            line = line.rstrip('\r').rsplit('\r', 1)[-1]
+        return line
+
+
 class QChatInteractiveSession:
     """
     Interactive qchat session handler with real-time output and spinner
     """
     
-    def __init__(self):
+    def __init__(self, env: Optional[Dict[str, str]] = None, transport: str = 'pipe',
+                 cancel_event: Optional[threading.Event] = None):
+        self.env = env  # Extra environment variables (e.g. AWS_PROFILE)
+        self.transport = transport  # 'pipe' or 'pty' (pseudo-terminal, streams like an interactive run)
         self.process = None
+        self.master_fd = None
         self.is_active = False
         self.output_queue = queue.Queue()
         self.reader_thread = None
         self.spinner = SpinnerManager()
+        # Owned by the hook so a cancel survives session restarts; cleared only once it has been handled
+        self.cancel_event = cancel_event if cancel_event is not None else threading.Event()
         
     def start_session(self):
         """Start the interactive qchat session"""
         try:
-            self.process = subprocess.Popen(
-                ["qchat", "chat", "--trust-all-tools"],
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,  # Merge stderr to stdout
-                text=True,
-                universal_newlines=True,
-                bufsize=0  # Unbuffered
-            )
+            if self.transport == 'pty' and os.name != 'posix':
+                print("[WARNING] PTY transport is only available on POSIX, falling back to pipes")
+                self.transport = 'pipe'
+
+            if self.transport == 'pty':
+                self.process = self._spawn_pty()
+                reader = self._read_output_pty
+            else:
+                self.process = subprocess.Popen(
+                    ["qchat", "chat", "--trust-all-tools"],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,  # Merge stderr to stdout
+                    text=True,
+                    universal_newlines=True,
+                    bufsize=0,  # Unbuffered
+                    env={**os.environ, **self.env} if self.env else None
+                )
+                reader = self._read_output
             self.is_active = True
-            print("[INFO] 🚀 Interactive qchat session started")
+            print(f"[INFO] 🚀 Interactive qchat session started ({self.transport})")
             
             # Start output reader thread
-            self.reader_thread = threading.Thread(target=self._read_output, daemon=True)
+            self.reader_thread = threading.Thread(target=reader, daemon=True)
             self.reader_thread.start()
             
             # Wait for initialization
@@ -98,24 +157,100 @@ class QChatInteractiveSession:
             print(f"[ERROR] ❌ Failed to start qchat session: {e}")
             return False
     
+    def _spawn_pty(self):
+        """Spawn qchat attached to a pseudo-terminal so it streams as it does interactively"""
+        import pty
+        import termios
+        import fcntl
+        import struct
+
+        master_fd, slave_fd = pty.openpty()
+        try:
+            # Wide window so long lines are not wrapped by qchat
+            fcntl.ioctl(slave_fd, termios.TIOCSWINSZ, struct.pack('HHHH', 50, 250, 0, 0))
+
+            # No echo of our own input, and no canonical-mode limit on long questions
+            attrs = termios.tcgetattr(slave_fd)
+            attrs[3] &= ~(termios.ECHO | termios.ICANON)
+            termios.tcsetattr(slave_fd, termios.TCSANOW, attrs)
+
+            process = subprocess.Popen(
+                ["qchat", "chat", "--trust-all-tools"],
+                stdin=slave_fd,
+                stdout=slave_fd,
+                stderr=slave_fd,
+                start_new_session=True,
+                env={**os.environ, **(self.env or {}), 'TERM': os.environ.get('TERM', 'xterm-256color')}
+            )
+        except Exception:
+            os.close(master_fd)
+            raise
+        finally:
+            os.close(slave_fd)
+
+        os.set_blocking(master_fd, False)
+        self.master_fd = master_fd
+        return process
+
+    def _read_output_pty(self):
+        """Read non-blocking chunks from the PTY and queue complete lines"""
+        splitter = IncrementalLineSplitter()
+        try:
+            while self.is_active and self.master_fd is not None:
+                ready, _, _ = select.select([self.master_fd], [], [], 0.1)
+                if not ready:
+                    if self.process and self.process.poll() is not None:
+                        break
+                    continue
+                try:
+                    data = os.read(self.master_fd, 65536)
+                except BlockingIOError:
+                    continue
+                except OSError:
+                    break  # EIO once qchat closes the terminal
+                if not data:
+                    break
+                for line in splitter.feed(data):
+                    self.output_queue.put(line)
+        except Exception as e:
+            print(f"[WARNING] Output reader error: {e}")
+        finally:
+            for line in splitter.flush():
+                self.output_queue.put(line)
+
+    def _write(self, text: str):
+        """Send input to qchat over whichever transport is active"""
+        if self.master_fd is not None:
+            # Enter on a terminal is \r
+            data = text.replace('\n', '\r').encode('utf-8')
+            while data:
+                try:
+                    written = os.write(self.master_fd, data)
+                    data = data[written:]
+                except BlockingIOError:
+                    select.select([], [self.master_fd], [], 1.0)
+        else:
+            self.process.stdin.write(text)
+            self.process.stdin.flush()
+
     def _read_output(self):
         """Read output from process in separate thread"""
         try:
-            while self.is_active and self.process and self.process.poll() is None:
+            # Read to EOF rather than until exit, so the last lines before a crash still reach the queue
+            while self.is_active and self.process:
                 line = self.process.stdout.readline()
-                if line:
-                    self.output_queue.put(line.rstrip('\n\r'))
-                else:
-                    time.sleep(0.1)
+                if not line:
+                    break
+                self.output_queue.put(line.rstrip('\n\r'))
         except Exception as e:
             print(f"[WARNING] Output reader error: {e}")
     
     def _clean_line(self, line):
         """Clean ANSI escape sequences and unwanted characters"""
-        import re
-        # Remove ANSI escape sequences
-        line = re.sub(r'\x1b\[[0-9;]*[mK]', '', line)
-        line = re.sub(r'\x1b\[[0-9]*[A-Za-z]', '', line)
+        # Remove ANSI escape sequences: OSC first (window titles, hyperlinks), then every CSI sequence
+        # (colors, cursor movement, private modes such as \x1b[?25l)
+        line = re.sub(r'\x1b\][^\x07\x1b]*(?:\x07|\x1b\\)', '', line)
+        line = re.sub(r'\x1b\[[0-?]*[ -/]*[@-~]', '', line)
         # Remove spinner characters
         line = re.sub(r'[⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏]', '', line)
         # Remove carriage returns
@@ -160,7 +295,60 @@ class QChatInteractiveSession:
                 return True
         return False
     
-    def ask_question_interactive(self, question: str):
+    def cancel(self):
+        """Request cancellation of the question in progress (safe to call from any thread)"""
+        self.cancel_event.set()
+
+    def interrupt(self, quiet_period: float = 1.5, max_wait: float = 10.0):
+        """
+        Stop the current generation and drain leftover output so the session can take the next question
+        """
+        self.spinner.stop()
+        if not self.process or self.process.poll() is not None:
+            self.is_active = False
+            return False
+
+        print("[INFO] ⏹️ Interrupting Amazon Q...")
+        try:
+            if self.master_fd is not None:
+                # The pty is not qchat's controlling terminal, so a written ^C raises no signal.
+                # qchat leads its own session (start_new_session), so signal that whole group
+                os.killpg(self.process.pid, signal.SIGINT)
+            elif os.name == 'posix':
+                self.process.send_signal(signal.SIGINT)
+            else:
+                self._write('\x03')
+        except Exception as e:
+            print(f"[WARNING] Interrupt failed: {e}")
+
+        # Drain until qchat has been quiet for quiet_period
+        drained = 0
+        deadline = time.time() + max_wait
+        last_output = time.time()
+        while time.time() < deadline and time.time() - last_output < quiet_period:
+            try:
+                self.output_queue.get(timeout=0.1)
+                drained += 1
+                last_output = time.time()
+            except queue.Empty:
+                if self.process.poll() is not None:
+                    break
+
+        if self.process.poll() is not None:
+            print("[WARNING] qchat exited while being interrupted")
+            self.is_active = False
+            return False
+
+        if time.time() - last_output < quiet_period:
+            # Still generating after max_wait: its output would leak into the next answer
+            print(f"[WARNING] qchat kept generating for {max_wait:.0f}s after the interrupt")
+            self.is_active = False
+            return False
+
+        print(f"[INFO] ✅ Session ready ({drained} leftover lines discarded)")
+        return True
+
+    def ask_question_interactive(self, question: str, timeout: Optional[float] = None):
         """
         Ask question with improved real-time interactive output
         """
@@ -169,30 +357,44 @@ class QChatInteractiveSession:
         
         print(f"[INFO] 💭 Processing question...")
         print(f"[INFO] 🔄 Sending to Amazon Q...")
+
+        deadline = time.time() + timeout if timeout else None
+        thinking_active = False
         
         try:
-            # Send question
-            self.process.stdin.write(question + '\n')
-            self.process.stdin.flush()
-            
-            # Auto-respond to prompts
-            auto_response_thread = threading.Thread(
-                target=self._auto_respond_to_prompts, 
-                daemon=True
-            )
-            auto_response_thread.start()
+            if self.cancel_event.is_set():
+                self.cancel_event.clear()
+                raise QuestionCancelled("Question cancelled before it was sent")
+
+            # Send question - qchat submits on every newline, so keep it on one line
+            self._write(' '.join(question.splitlines()) + '\n')
             
             # Read responses with improved handling
             response_started = False
             no_output_count = 0
             max_no_output = 150  # 15 seconds of no output
-            thinking_active = False
             content_lines = 0
             
             while self.is_active:
+                if self.cancel_event.is_set() or (deadline and time.time() > deadline):
+                    cancelled = self.cancel_event.is_set()
+                    if thinking_active:
+                        self.spinner.stop()
+                        thinking_active = False
+                    self.interrupt()
+                    if cancelled:
+                        self.cancel_event.clear()
+                    else:
+                        raise QuestionTimeout(f"Question exceeded its {timeout:.0f}s deadline")
+                    raise QuestionCancelled("Question cancelled")
+
                 try:
                     line = self.output_queue.get(timeout=0.1)
                     no_output_count = 0
+
+                    # Answer y/n/t prompts here: a second reader on the queue would steal answer lines
+                    if self._auto_respond_to_prompt(line):
+                        continue
                     
                     cleaned_line = self._clean_line(line)
                     
@@ -225,6 +427,10 @@ class QChatInteractiveSession:
                         yield cleaned_line
                         
                 except queue.Empty:
+                    if self._has_exited():
+                        # qchat died mid-answer: fail so the hook restarts the session and resumes
+                        self.is_active = False
+                        raise Exception(f"qchat exited unexpectedly (exit code {self.process.returncode})")
                     no_output_count += 1
                     if no_output_count > max_no_output:
                         # Stop spinner before finishing
@@ -237,35 +443,35 @@ class QChatInteractiveSession:
             # Ensure spinner is stopped
             if thinking_active:
                 self.spinner.stop()
-                    
+
+        except QuestionCancelled as e:
+            print(f"[INFO] ⏹️ {e}")
+            raise
         except Exception as e:
             if thinking_active:
                 self.spinner.stop()
             print(f"[ERROR] ❌ Interactive question failed: {e}")
             raise e
     
-    def _auto_respond_to_prompts(self):
-        """Auto-respond to y/n/t prompts in separate thread"""
+    def _has_exited(self):
+        """True once qchat has exited and all of its output has been read"""
+        if self.process.poll() is None:
+            return False
+        if self.reader_thread and self.reader_thread.is_alive():
+            return False
+        return self.output_queue.empty()
+
+    def _auto_respond_to_prompt(self, line):
+        """Answer a y/n/t prompt with 'y'; returns True when the line was a prompt"""
+        if not any(prompt in line.lower() for prompt in ['(y/n)', '(y/n/t)', 'continue?', 'proceed?']):
+            return False
+        print(f"[AUTO-RESPONSE] 🤖 Detected prompt: {line}")
+        print("[AUTO-RESPONSE] 🤖 Sending 'y' response...")
         try:
-            while self.is_active and self.process and self.process.poll() is None:
-                try:
-                    line = self.output_queue.get(timeout=1.0)
-                    
-                    # Check for prompts that need auto-response
-                    if any(prompt in line.lower() for prompt in ['(y/n)', '(y/n/t)', 'continue?', 'proceed?']):
-                        print(f"[AUTO-RESPONSE] 🤖 Detected prompt: {line}")
-                        print("[AUTO-RESPONSE] 🤖 Sending 'y' response...")
-                        self.process.stdin.write('y\n')
-                        self.process.stdin.flush()
-                        
-                except queue.Empty:
-                    continue
-                except Exception as e:
-                    print(f"[WARNING] Auto-response error: {e}")
-                    break
-                    
+            self._write('y\n')
         except Exception as e:
-            print(f"[WARNING] Auto-response thread error: {e}")
+            print(f"[WARNING] Auto-response error: {e}")
+        return True
     
     def ask_question_with_file(self, question: str):
         """
@@ -384,8 +590,7 @@ class QChatInteractiveSession:
                 # Send quit command
                 if self.process.poll() is None:
                     try:
-                        self.process.stdin.write('/quit\n')
-                        self.process.stdin.flush()
+                        self._write('/quit\n')
                         time.sleep(1)
                     except:
                         pass
@@ -409,45 +614,157 @@ class QChatInteractiveSession:
         if self.reader_thread and self.reader_thread.is_alive():
             self.reader_thread.join(timeout=2)
 
+        if self.master_fd is not None:
+            try:
+                os.close(self.master_fd)
+            except OSError:
+                pass
+            self.master_fd = None
+
+
+class ResponseCheckpoint:
+    """
+    Record of streamed response lines used to resume an interrupted generation
+    """
+
+    def __init__(self, question: str, max_context_chars: int = 6000, overlap_window: int = 20):
+        self.question = question
+        self.lines = []
+        self.max_context_chars = max_context_chars
+        self.overlap_window = overlap_window
+
+    def record(self, line: str):
+        self.lines.append(line)
+
+    def continuation_question(self):
+        """Original question plus the tail of the response received so far"""
+        if not self.lines:
+            return self.question
+
+        progress, size = [], 0
+        for line in reversed(self.lines):
+            size += len(line) + 1
+            if size > self.max_context_chars:
+                break
+            progress.append(line)
+        progress.reverse()
+
+        return (f"{self.question}\n\n"
+                f"[CONTINUATION] Your previous answer to this request was interrupted after "
+                f"{len(self.lines)} lines. Do not start over and do not repeat earlier content. "
+                f"Any files already written are kept. The last lines you produced were:\n"
+                + "\n".join(progress)
+                + "\n[END OF PREVIOUS OUTPUT] Continue exactly from where the output stopped.")
+
+    def deduplicate(self, lines):
+        """Skip replayed lines at the start of a resumed stream"""
+        recent = set(self.lines[-self.overlap_window:])
+        replaying = True
+        for line in lines:
+            if replaying and line in recent:
+                continue
+            replaying = False
+            yield line
+
 
 class AmazonQDeveloperHook:
     """
     Enhanced Amazon Q Developer Hook with real-time interaction
     """
 
-    def __init__(self, ide_extension: bool = False):
+    def __init__(self, ide_extension: bool = False, env: Optional[Dict[str, str]] = None,
+                 max_retries: int = 3, retry_backoff: float = 2.0, transport: str = 'pipe'):
         self.ide_extension = ide_extension
+        self.env = env
+        self.transport = transport
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff  # Seconds before the first retry, doubled each time
         self.interactive_session = None
+        self.cancel_event = threading.Event()  # Shared with every session this hook starts
 
     def start_interactive_session_with_tools(self):
         """Start an interactive session with --trust-all-tools"""
-        self.interactive_session = QChatInteractiveSession()
+        self.interactive_session = QChatInteractiveSession(env=self.env, transport=self.transport,
+                                                           cancel_event=self.cancel_event)
         return self.interactive_session.start_session()
     
-    def ask_question_with_auto_responses(self, question: str):
+    def cancel(self):
+        """Cancel the question in progress, or the next one if none is running yet (safe from any thread)"""
+        self.cancel_event.set()
+
+    def clear_cancel(self):
+        """Drop a cancel request left over from earlier work (e.g. before a pooled hook takes a new job)"""
+        self.cancel_event.clear()
+
+    def interrupt(self):
+        """Synchronously stop any generation still running (e.g. after Ctrl-C) and drain its output"""
+        if self.interactive_session and not self.interactive_session.interrupt():
+            self.end_interactive_session_with_tools()
+
+    def _raise_if_cancelled(self):
+        if self.cancel_event.is_set():
+            self.cancel_event.clear()
+            raise QuestionCancelled("Question cancelled before it was sent")
+
+    def ask_question_with_auto_responses(self, question: str, timeout: Optional[float] = None):
         """
-        Ask a question using interactive session with real-time output
+        Ask a question using interactive session with real-time output,
+        resuming from a checkpoint if the session fails mid-response
         """
-        if not self.interactive_session:
-            print("[INFO] 🚀 Starting new interactive session...")
-            if not self.start_interactive_session_with_tools():
-                raise Exception("Failed to start interactive session")
-        
-        try:
-            for line in self.interactive_session.ask_question_interactive(question):
-                yield line
-        except Exception as e:
-            print(f"[ERROR] ❌ Interactive question failed: {e}")
-            # Try to restart session once
-            print("[INFO] 🔄 Attempting to restart session...")
-            self.end_interactive_session_with_tools()
-            if self.start_interactive_session_with_tools():
-                for line in self.interactive_session.ask_question_interactive(question):
+        checkpoint = ResponseCheckpoint(question)
+        deadline = time.time() + timeout if timeout else None
+        attempt = 0
+
+        while True:
+            try:
+                # Catches a cancel that arrived during the retry backoff, before paying for a new session
+                self._raise_if_cancelled()
+                if not self.interactive_session:
+                    print("[INFO] 🚀 Starting new interactive session...")
+                    if not self.start_interactive_session_with_tools():
+                        raise Exception("Failed to start interactive session")
+
+                # Catches a cancel that arrived while the session was starting
+                self._raise_if_cancelled()
+
+                remaining = None
+                if deadline:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise QuestionTimeout(f"Question exceeded its {timeout:.0f}s deadline")
+
+                if attempt == 0:
+                    stream = self.interactive_session.ask_question_interactive(question, remaining)
+                else:
+                    stream = checkpoint.deduplicate(
+                        self.interactive_session.ask_question_interactive(checkpoint.continuation_question(), remaining)
+                    )
+
+                for line in stream:
+                    checkpoint.record(line)
                     yield line
-            else:
-                raise e
+                return
+
+            except QuestionCancelled:
+                # Not a failure: keep the warm session unless the interrupt killed it
+                if self.interactive_session and not self.interactive_session.is_active:
+                    self.end_interactive_session_with_tools()
+                raise
+
+            except Exception as e:
+                print(f"[ERROR] ❌ Interactive question failed: {e}")
+                self.end_interactive_session_with_tools()
+
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise e
+
+                delay = self.retry_backoff * (2 ** (attempt - 1))
+                print(f"[INFO] 🔄 Restarting session in {delay:.1f}s "
+                      f"(retry {attempt}/{self.max_retries}, resuming after {len(checkpoint.lines)} lines)...")
+                self.cancel_event.wait(delay)  # A cancel cuts the wait short and is raised on the next attempt
     
-    def ask_question_stream(self, question: str, callback=None):
+    def ask_question_stream(self, question: str, callback=None, timeout: Optional[float] = None):
         """
         Main streaming method used by CLI - enhanced with progress tracking
         """
@@ -458,7 +775,7 @@ class AmazonQDeveloperHook:
             line_count = 0
             start_time = time.time()
             
-            for line in self.ask_question_with_auto_responses(question):
+            for line in self.ask_question_with_auto_responses(question, timeout):
                 line_count += 1
                 elapsed_time = time.time() - start_time
                 
@@ -474,6 +791,8 @@ class AmazonQDeveloperHook:
             total_time = time.time() - start_time
             print(f"[INFO] ✅ Stream completed! {line_count} lines in {total_time:.1f}s")
             
+        except QuestionCancelled:
+            raise
         except Exception as e:
             print(f"[ERROR] ❌ Stream error: {e}")
             raise e
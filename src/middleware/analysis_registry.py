@@ -0,0 +1,204 @@
+import os
+import re
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+
+# Prompt templates ship next to the sources, so lookups work from any working directory
+PROMPT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'prompt')
+
+PLACEHOLDER_PATTERN = re.compile(r'\{([A-Z_]+)\}')
+
+LANGUAGE_NAMES = {'ko': 'Korean', 'en': 'English'}
+
+
+def read_prompt(filename: str, language: str = 'ko'):
+    """Read a prompt file, preferring the language folder and falling back to Korean"""
+    candidates = [os.path.join(PROMPT_DIR, filename)]
+    if language != 'ko':
+        candidates.insert(0, os.path.join(PROMPT_DIR, language, filename))
+
+    for path in candidates:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            continue
+    raise FileNotFoundError(f"Prompt file {filename} not found in {PROMPT_DIR}")
+
+
+class PromptTemplate:
+    """
+    Prompt template split once into literal and placeholder segments
+    """
+
+    def __init__(self, text: str, placeholders):
+        self.text = text
+        self.placeholders = set(placeholders)
+        self.segments = []  # (is_placeholder, value)
+
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(text):
+            # Placeholders not declared by the analysis (e.g. {YYYYMMDD_HHMMSS}) stay literal for Q
+            if match.group(1) not in self.placeholders:
+                continue
+            self.segments.append((False, text[position:match.start()]))
+            self.segments.append((True, match.group(1)))
+            position = match.end()
+        self.segments.append((False, text[position:]))
+
+    def render(self, values: Dict[str, str]):
+        missing = self.placeholders - set(values)
+        if missing:
+            raise ValueError(f"Missing prompt values: {', '.join(sorted(missing))}")
+        return ''.join(values[value] if is_placeholder else value for is_placeholder, value in self.segments)
+
+
+class AnalysisSpec:
+    """
+    Declarative description of one analysis
+    """
+
+    def __init__(self, key: str, template: str, placeholders, output_folder: str,
+                 localized_output: bool = False, names: Optional[Dict[str, str]] = None,
+                 titles: Optional[Dict[str, str]] = None, menu: Optional[Dict[str, str]] = None,
+                 resource_types=(), metrics: bool = False, reports: Optional[Dict[str, str]] = None):
+        self.key = key
+        self.template = template  # File name under src/prompt (and src/prompt/en)
+        self.placeholders = tuple(placeholders)
+        self.output_folder = output_folder
+        self.localized_output = localized_output  # English reports go to output/en/<folder>
+        self.names = names or {}  # language -> analysis name shown while processing
+        self.titles = titles or {}  # language -> report title, may use placeholders
+        self.menu = menu or {}  # language -> menu label
+        self.resource_types = tuple(resource_types)  # Inventory snapshot sections this analysis reads
+        self.metrics = metrics  # Attach CloudWatch utilization for those resources
+        self.reports = reports or {}  # language -> report file name, may use placeholders and {TIMESTAMP}
+        self._compiled = {}
+        self._lock = threading.Lock()
+
+    @property
+    def input_kind(self):
+        """What the user has to provide: 'directory' or 'region'"""
+        return 'directory' if 'DIR_PATH' in self.placeholders else 'region'
+
+    def template_for(self, language: str):
+        """Load and compile the template for a language on first use"""
+        compiled = self._compiled.get(language)
+        if compiled is None:
+            with self._lock:
+                compiled = self._compiled.get(language)
+                if compiled is None:
+                    compiled = PromptTemplate(read_prompt(self.template, language), self.placeholders)
+                    self._compiled[language] = compiled
+        return compiled
+
+    def build_question(self, language: str, **values):
+        return self.template_for(language).render(values)
+
+    def title(self, language: str, **values):
+        title = self.titles.get(language) or self.titles.get('ko', self.key)
+        return PLACEHOLDER_PATTERN.sub(lambda match: values.get(match.group(1), match.group(0)), title)
+
+    def name(self, language: str):
+        return self.names.get(language) or self.names.get('ko', self.key)
+
+    def output_dir(self, language: str):
+        if self.localized_output and language == 'en':
+            return f'output/en/{self.output_folder}'
+        return f'output/{self.output_folder}'
+
+    def report_path(self, language: str, run_id: Optional[str] = None, **values):
+        """Path the report of one run is saved to; run_id keeps concurrent runs from sharing a file"""
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        if run_id:
+            timestamp = f"{timestamp}_{run_id}"
+        name = self.reports.get(language) or self.reports.get('ko', f'{self.key}_{{TIMESTAMP}}.html')
+        values = dict(values, TIMESTAMP=timestamp)
+        name = PLACEHOLDER_PATTERN.sub(lambda match: values.get(match.group(1), match.group(0)), name)
+        return os.path.join(self.output_dir(language), name)
+
+    def translation_question(self, report_path: str, target_language: str):
+        """Question asking Q to translate a finished report; returns (question, target path)"""
+        global _translation_template
+        if _translation_template is None:
+            _translation_template = PromptTemplate(read_prompt('translate_report.md'),
+                                                   ['SOURCE_PATH', 'TARGET_PATH', 'TARGET_LANGUAGE'])
+
+        base, extension = os.path.splitext(os.path.basename(report_path))
+        target_path = os.path.join(self.output_dir(target_language), f"{base}_{target_language}{extension}")
+        question = _translation_template.render({
+            'SOURCE_PATH': report_path,
+            'TARGET_PATH': target_path,
+            'TARGET_LANGUAGE': LANGUAGE_NAMES.get(target_language, target_language),
+        })
+        return question, target_path
+
+
+_translation_template = None
+
+ANALYSES: Dict[str, AnalysisSpec] = {}
+
+
+def register(spec: AnalysisSpec):
+    """Add an analysis to the registry (menu order follows registration order)"""
+    ANALYSES[spec.key] = spec
+    return spec
+
+
+def get_analysis(key: str):
+    spec = ANALYSES.get(key)
+    if spec is None:
+        raise ValueError(f"Unknown analysis type: {key}")
+    return spec
+
+
+register(AnalysisSpec(
+    'modernization_path', 'modernization_path.md', ['REGION', 'REPORT_PATH'], 'modernization', localized_output=True,
+    names={'ko': '현대화 경로 분석', 'en': 'modernization path analysis'},
+    titles={'ko': '{REGION} 리전 현대화 경로 분석 보고서', 'en': '{REGION} Region Modernization Path Analysis Report'},
+    menu={'ko': '사용중인 AWS 리소스 기반 현대화 경로 분석', 'en': 'AWS Resource-based Modernization Path Analysis'},
+    resource_types=['ec2:instance', 'ec2:volume', 'rds:db_instance', 'lambda:function',
+                    'elbv2:load_balancer', 'dynamodb:table'],
+    metrics=True,
+    reports={'ko': 'modernization_roadmap_{TIMESTAMP}.html', 'en': 'modernization_roadmap_{TIMESTAMP}.html'},
+))
+
+register(AnalysisSpec(
+    'security_check', 'security_check.md', ['REGION', 'REPORT_PATH'], 'security', localized_output=True,
+    names={'ko': '보안 점검', 'en': 'security assessment'},
+    titles={'ko': '{REGION} 리전 보안 점검 보고서', 'en': '{REGION} Region Security Assessment Report'},
+    menu={'ko': '사용중인 AWS 리소스 기반 보안 점검', 'en': 'AWS Resource-based Security Assessment'},
+    resource_types=['ec2:security_group', 'ec2:instance', 'ec2:vpc', 'rds:db_instance', 's3:bucket'],
+    reports={'ko': 'aws_security_assessment_{REGION}_{TIMESTAMP}.html', 'en': 'security_assessment_{TIMESTAMP}.html'},
+))
+
+register(AnalysisSpec(
+    'well_architected', 'well_architected_review.md', ['REGION', 'REPORT_PATH'], 'well-architected',
+    names={'ko': 'Well-Architected 리뷰', 'en': 'Well-Architected review'},
+    titles={'ko': '{REGION} 리전 Well-Architected 리뷰 보고서', 'en': '{REGION} Region Well-Architected Review Report'},
+    menu={'ko': '사용중인 AWS 리소스 기반 Well-Architected 리뷰', 'en': 'AWS Resource-based Well-Architected Review'},
+    resource_types=['ec2:instance', 'ec2:volume', 'ec2:vpc', 'ec2:subnet', 'ec2:nat_gateway', 'rds:db_instance',
+                    'lambda:function', 'elbv2:load_balancer', 'dynamodb:table', 's3:bucket'],
+    metrics=True,
+    reports={'ko': 'aws_well_architected_{TIMESTAMP}.html', 'en': 'well_architected_review_{TIMESTAMP}.html'},
+))
+
+register(AnalysisSpec(
+    'architecture_diagram', 'architecture_diagram.md', ['REGION', 'REPORT_PATH'], 'architecture',
+    names={'ko': '아키텍처 다이어그램 생성', 'en': 'architecture diagram generation'},
+    titles={'ko': '{REGION} 리전 아키텍처 다이어그램', 'en': '{REGION} Region Architecture Diagram'},
+    menu={'ko': '사용중인 AWS 리소스 기반 아키텍처 다이어그램 생성', 'en': 'AWS Resource-based Architecture Diagram Generation'},
+    resource_types=['ec2:vpc', 'ec2:subnet', 'ec2:nat_gateway', 'ec2:instance', 'rds:db_instance',
+                    'elbv2:load_balancer', 'lambda:function'],
+    reports={'ko': 'aws_architecture_diagram_{REGION}_{TIMESTAMP}.drawio', 'en': 'architecture_diagram_{TIMESTAMP}.html'},
+))
+
+register(AnalysisSpec(
+    'service_screener', 'service_screener_review.md', ['DIR_PATH', 'REPORT_PATH'], 'service-screener',
+    names={'ko': 'Service Screener 기반 Well-Architected Review', 'en': 'Service Screener-based Well-Architected Review'},
+    titles={'ko': 'Service Screener 기반 Well-Architected Review', 'en': 'Service Screener-based Well-Architected Review'},
+    menu={'ko': 'Service Screener 결과 기반 Well-Architected Review', 'en': 'Service Screener Results-based Well-Architected Review'},
+    reports={'ko': 'aws_service_screener_summary_{TIMESTAMP}.html', 'en': 'service_screener_review_{TIMESTAMP}.html'},
+))
@@ -0,0 +1,219 @@
+import random
+import threading
+import time
+from typing import Optional
+
+
+THROTTLE_ERROR_CODES = {
+    'Throttling', 'ThrottlingException', 'ThrottledException', 'RequestThrottled',
+    'RequestThrottledException', 'TooManyRequestsException', 'RequestLimitExceeded',
+    'ProvisionedThroughputExceededException', 'SlowDown', 'BandwidthLimitExceeded',
+    'EC2ThrottledException', 'PriorRequestNotComplete',
+}
+
+# Retried like botocore's standard mode, but without shrinking the shared limit
+TRANSIENT_ERROR_CODES = {
+    'RequestTimeout', 'RequestTimeoutException', 'InternalError', 'InternalFailure',
+    'ServiceUnavailable', 'TransactionInProgressException', 'IDPCommunicationError',
+}
+
+
+class ThrottledError(Exception):
+    """Raised when a call is still throttled after every retry"""
+
+
+class AdaptiveLimit:
+    """
+    Token bucket plus AIMD concurrency window for one (account, region, service)
+    """
+
+    def __init__(self, rate: float, burst: int, concurrency: int, max_rate: float, max_concurrency: int):
+        self.rate = rate  # Tokens (requests) per second
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.concurrency = float(concurrency)
+        self.max_rate = max_rate
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self.requests = 0
+        self.throttles = 0
+        self.first_request = None
+        self.latency = None  # EWMA of successful call latency
+        self.best_latency = None
+        self.last_decrease = None  # When the limits were last halved
+        self.condition = threading.Condition()
+
+    def acquire(self):
+        """Wait for both a token and a free concurrency slot"""
+        with self.condition:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.in_flight < int(self.concurrency) and self.tokens >= 1:
+                    self.tokens -= 1
+                    self.in_flight += 1
+                    self.requests += 1
+                    if self.first_request is None:
+                        self.first_request = now
+                    return
+
+                wait = (1 - self.tokens) / self.rate if self.tokens < 1 else 0.05
+                self.condition.wait(max(wait, 0.005))
+
+    def release(self, latency: Optional[float], throttled: bool, started: Optional[float] = None):
+        """Apply AIMD: additive increase on healthy calls, multiplicative decrease on throttling
+
+        started is the call's monotonic start time. Throttles on calls sent before the last decrease
+        belong to the same congestion event and do not halve the limits again.
+        """
+        with self.condition:
+            self.in_flight -= 1
+            if throttled:
+                self.throttles += 1
+                if started is None or self.last_decrease is None or started >= self.last_decrease:
+                    self.rate = max(0.5, self.rate * 0.5)
+                    self.concurrency = max(1.0, self.concurrency * 0.5)
+                    self.tokens = min(self.tokens, 0.0)
+                    self.last_decrease = time.monotonic()
+            elif latency is not None:
+                self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+                self.best_latency = latency if self.best_latency is None else min(self.best_latency, latency)
+                # Hold steady while latency is well above the best seen - the service is queueing
+                if self.latency < 2 * self.best_latency + 0.05:
+                    self.rate = min(self.max_rate, self.rate + 1.0 / max(self.rate, 1.0))
+                    self.concurrency = min(self.max_concurrency, self.concurrency + 1.0 / self.concurrency)
+            self.condition.notify_all()
+
+    def stats(self):
+        with self.condition:
+            elapsed = time.monotonic() - self.first_request if self.first_request else 0
+            return {
+                'requests': self.requests,
+                'throttles': self.throttles,
+                'effective_rate': round(self.requests / elapsed, 2) if elapsed > 0 else 0.0,
+                'rate_limit': round(self.rate, 2),
+                'concurrency_limit': int(self.concurrency),
+                'latency_ms': round(self.latency * 1000, 1) if self.latency is not None else None,
+            }
+
+
+class AdaptiveRateController:
+    """
+    Shared rate controller for every AWS API call made by ArchiQ
+    """
+
+    def __init__(self, initial_rate: float = 5.0, burst: int = 10, initial_concurrency: int = 4,
+                 max_rate: float = 100.0, max_concurrency: int = 32, max_retries: int = 8,
+                 max_transient_retries: int = 2):
+        self.initial_rate = initial_rate
+        self.burst = burst
+        self.initial_concurrency = initial_concurrency
+        self.max_rate = max_rate
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.max_transient_retries = max_transient_retries  # 5xx, timeouts, connection resets
+        self.limits = {}
+        self.lock = threading.Lock()
+
+    def limit_for(self, account: Optional[str], region: str, service: str):
+        key = (account or 'default', region, service)
+        with self.lock:
+            limit = self.limits.get(key)
+            if limit is None:
+                limit = AdaptiveLimit(self.initial_rate, self.burst, self.initial_concurrency,
+                                      self.max_rate, self.max_concurrency)
+                self.limits[key] = limit
+            return limit
+
+    @staticmethod
+    def _is_transient(error):
+        """Server-side and network failures worth retrying (botocore standard-mode classification)"""
+        from botocore.exceptions import ClientError, ConnectionError, HTTPClientError
+
+        if isinstance(error, (ConnectionError, HTTPClientError)):
+            return True
+        if isinstance(error, ClientError):
+            status = error.response.get('ResponseMetadata', {}).get('HTTPStatusCode') or 0
+            return status >= 500 or error.response.get('Error', {}).get('Code') in TRANSIENT_ERROR_CODES
+        return False
+
+    def call(self, limit: AdaptiveLimit, func, *args, **kwargs):
+        """Run one API call under the limit, retrying throttled and transient failures with jittered backoff"""
+        from botocore.exceptions import ClientError
+
+        attempt = transient_attempt = 0
+        while True:
+            limit.acquire()
+            started = time.monotonic()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                throttled = isinstance(e, ClientError) and e.response.get('Error', {}).get('Code') in THROTTLE_ERROR_CODES
+                limit.release(None, throttled, started)
+                if throttled:
+                    if attempt == self.max_retries:
+                        raise ThrottledError(str(e)) from e
+                    attempt += 1
+                elif self._is_transient(e) and transient_attempt < self.max_transient_retries:
+                    transient_attempt += 1
+                    print(f"[WARNING] Transient AWS error, retrying ({transient_attempt}/{self.max_transient_retries}): {e}")
+                else:
+                    raise
+                time.sleep(random.uniform(0, min(20.0, 0.2 * (2 ** (attempt + transient_attempt - 1)))))
+                continue
+
+            limit.release(time.monotonic() - started, False, started)
+            return result
+
+    def wrap(self, client, account: Optional[str] = None):
+        """Route every API call of a boto3 client (including paginators) through the controller"""
+        limit = self.limit_for(account, client.meta.region_name, client.meta.service_model.service_name)
+        make_api_call = client._make_api_call
+
+        def limited_api_call(operation_name, api_params):
+            return self.call(limit, make_api_call, operation_name, api_params)
+
+        client._make_api_call = limited_api_call
+        return client
+
+    def report(self):
+        """Per (account, region, service) request, throttle and rate statistics"""
+        with self.lock:
+            items = list(self.limits.items())
+        return {'/'.join(key): limit.stats() for key, limit in items}
+
+    def print_report(self):
+        for key, stats in sorted(self.report().items()):
+            print(f"[RATE] 📈 {key}: {stats['requests']} requests, {stats['throttles']} throttled, "
+                  f"{stats['effective_rate']}/s effective (limit {stats['rate_limit']}/s, "
+                  f"concurrency {stats['concurrency_limit']})")
+
+
+_default_controller = None
+_default_lock = threading.Lock()
+
+
+def get_rate_controller():
+    """Process-wide controller shared by every client"""
+    global _default_controller
+    with _default_lock:
+        if _default_controller is None:
+            _default_controller = AdaptiveRateController()
+        return _default_controller
+
+
+def create_client(service: str, region: str, account: Optional[str] = None,
+                  controller: Optional[AdaptiveRateController] = None):
+    """Create a boto3 client whose calls are paced by the shared rate controller"""
+    import boto3
+    from botocore.config import Config
+
+    session = boto3.Session(profile_name=account) if account else boto3.Session()
+    # Retries (throttling and transient errors) are handled by the controller so throttling feeds back
+    # into the shared limit
+    config = Config(retries={'mode': 'standard', 'max_attempts': 1}, max_pool_connections=50)
+    client = session.client(service, region_name=region, config=config)
+    return (controller or get_rate_controller()).wrap(client, account)
@@ -0,0 +1,69 @@
+import hashlib
+import os
+from datetime import datetime, timezone
+from typing import Optional
+
+from middleware.aws_rate_limiter import create_client
+
+
+class CloudTrailChangeDetector:
+    """
+    Detect AWS changes in a region since a point in time using CloudTrail write events
+    """
+
+    def __init__(self, max_events: int = 200):
+        self.max_events = max_events
+
+    def changes_since(self, account: Optional[str], region: str, since: float):
+        """Return write events since the timestamp, or None when they cannot be determined
+
+        More than max_events changes also returns None: a truncated list would let an
+        incremental run miss everything past the cap, so callers fall back to a full run.
+        """
+        try:
+            import boto3  # noqa: F401
+        except ImportError:
+            print("[WARNING] boto3 is not installed; change detection disabled")
+            return None
+
+        try:
+            client = create_client('cloudtrail', region, account)
+            paginator = client.get_paginator('lookup_events')
+            pages = paginator.paginate(
+                LookupAttributes=[{'AttributeKey': 'ReadOnly', 'AttributeValue': 'false'}],
+                StartTime=datetime.fromtimestamp(since, tz=timezone.utc),
+                EndTime=datetime.now(tz=timezone.utc),
+            )
+
+            changes = []
+            for page in pages:
+                for event in page.get('Events', []):
+                    changes.append({
+                        'event': event.get('EventName'),
+                        'source': event.get('EventSource'),
+                        'time': event['EventTime'].isoformat() if event.get('EventTime') else None,
+                        'resources': [resource.get('ResourceName') for resource in event.get('Resources', [])],
+                    })
+                    if len(changes) > self.max_events:
+                        print(f"[INFO] More than {self.max_events} changes in {region}; a full analysis is needed")
+                        return None
+            return changes
+
+        except Exception as e:
+            print(f"[WARNING] CloudTrail change lookup failed for {region}: {e}")
+            return None
+
+
+def directory_fingerprint(directory: str):
+    """Hash file names, sizes and mtimes under a directory"""
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            digest.update(f"{os.path.relpath(path, directory)}:{stat.st_size}:{stat.st_mtime_ns}\n".encode('utf-8'))
+    return digest.hexdigest()
@@ -0,0 +1,124 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional
+
+from middleware.aws_rate_limiter import create_client
+from middleware.snapshot import SnapshotWriter, SnapshotReader
+
+
+# resource type -> (service, operation, result key, id field)
+RESOURCE_TYPES = {
+    'ec2:instance': ('ec2', 'describe_instances', 'Reservations', 'InstanceId'),
+    'ec2:vpc': ('ec2', 'describe_vpcs', 'Vpcs', 'VpcId'),
+    'ec2:subnet': ('ec2', 'describe_subnets', 'Subnets', 'SubnetId'),
+    'ec2:security_group': ('ec2', 'describe_security_groups', 'SecurityGroups', 'GroupId'),
+    'ec2:volume': ('ec2', 'describe_volumes', 'Volumes', 'VolumeId'),
+    'ec2:nat_gateway': ('ec2', 'describe_nat_gateways', 'NatGateways', 'NatGatewayId'),
+    'rds:db_instance': ('rds', 'describe_db_instances', 'DBInstances', 'DBInstanceIdentifier'),
+    'lambda:function': ('lambda', 'list_functions', 'Functions', 'FunctionName'),
+    'elbv2:load_balancer': ('elbv2', 'describe_load_balancers', 'LoadBalancers', 'LoadBalancerArn'),
+    'dynamodb:table': ('dynamodb', 'list_tables', 'TableNames', None),
+    's3:bucket': ('s3', 'list_buckets', 'Buckets', 'Name'),
+}
+
+
+class InventoryCollector:
+    """
+    Collect AWS resources for one (account, region) into a snapshot file
+    """
+
+    def __init__(self, region: str, account: Optional[str] = None, max_workers: int = 8):
+        self.region = region
+        self.account = account
+        self.max_workers = max_workers
+        self.clients = {}
+
+    def _client(self, service):
+        if service not in self.clients:
+            self.clients[service] = create_client(service, self.region, self.account)
+        return self.clients[service]
+
+    def _fetch(self, resource_type):
+        """Fetch every resource of one type (pagination included)"""
+        service, operation, result_key, _ = RESOURCE_TYPES[resource_type]
+        client = self._client(service)
+
+        if client.can_paginate(operation):
+            pages = client.get_paginator(operation).paginate()
+        else:
+            pages = [getattr(client, operation)()]
+
+        resources = []
+        for page in pages:
+            items = page.get(result_key, [])
+            if resource_type == 'ec2:instance':
+                items = [instance for reservation in items for instance in reservation.get('Instances', [])]
+            elif resource_type == 'dynamodb:table':
+                items = [{'TableName': name} for name in items]
+            resources.extend(items)
+        return resources
+
+    def collect(self, path: Optional[str] = None, resource_types=None):
+        """Collect resource types in parallel and write them to a snapshot; returns its path"""
+        resource_types = list(resource_types or RESOURCE_TYPES)
+        if path is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            path = f"output/inventory/{self.account or 'default'}_{self.region}_{timestamp}.arqs"
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+        print(f"[INFO] 📦 Collecting {len(resource_types)} resource types in {self.region}...")
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {resource_type: executor.submit(self._fetch, resource_type) for resource_type in resource_types}
+
+            with SnapshotWriter(path, {'account': self.account, 'region': self.region}) as writer:
+                for resource_type, future in futures.items():
+                    try:
+                        resources = future.result()
+                    except Exception as e:
+                        print(f"[WARNING] Failed to collect {resource_type}: {e}")
+                        continue
+                    writer.add_section(resource_type, resources)
+                    print(f"[INFO] ✅ {resource_type}: {len(resources)}")
+
+        print(f"[INFO] 💾 Inventory snapshot saved: {path}")
+        return path
+
+
+def find_recent_snapshot(region: str, account: Optional[str] = None, max_age: float = 3600):
+    """Newest snapshot for (account, region) younger than max_age seconds"""
+    directory = 'output/inventory'
+    prefix = f"{account or 'default'}_{region}_"
+    if not os.path.isdir(directory):
+        return None
+
+    newest_path, newest_mtime = None, datetime.now().timestamp() - max_age
+    for entry in os.scandir(directory):
+        if entry.name.startswith(prefix) and entry.name.endswith('.arqs') and entry.stat().st_mtime >= newest_mtime:
+            newest_path, newest_mtime = entry.path, entry.stat().st_mtime
+    return newest_path
+
+
+def resource_id(resource_type: str, resource: dict):
+    id_field = RESOURCE_TYPES.get(resource_type, (None, None, None, None))[3]
+    return resource.get(id_field) if id_field else next(iter(resource.values()), None)
+
+
+def summarize_inventory(path: str, resource_types, max_ids: int = 50):
+    """Compact text summary of the given sections, for appending to a prompt"""
+    lines = []
+    with SnapshotReader(path) as reader:
+        lines.append(f"Collected AWS inventory for region {reader.metadata.get('region')} "
+                     f"(snapshot {os.path.basename(path)}):")
+        for resource_type in resource_types:
+            if resource_type not in reader.sections:
+                continue
+            ids = []
+            for resource in reader.iter_resources(resource_type):
+                if len(ids) >= max_ids:
+                    break
+                ids.append(str(resource_id(resource_type, resource)))
+            more = reader.count(resource_type) - len(ids)
+            suffix = f" (+{more} more)" if more > 0 else ""
+            lines.append(f"- {resource_type}: {reader.count(resource_type)} — {', '.join(ids)}{suffix}")
+    return '\n'.join(lines)
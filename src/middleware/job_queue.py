@@ -0,0 +1,157 @@
+import heapq
+import itertools
+import threading
+import time
+import uuid
+from typing import Optional
+
+
+class Job:
+    """
+    A single analysis request shared by every caller that asked for it
+    """
+
+    def __init__(self, key: tuple, params: dict, priority: int = 0):
+        self.id = uuid.uuid4().hex[:12]
+        self.key = key
+        self.params = params
+        self.priority = priority
+        self.status = 'queued'  # queued -> running -> completed | failed | cancelled
+        self.subscribers = 1
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.timeout = params.get('timeout')  # Seconds the question may run before it is interrupted
+        self.cancel_requested = False
+        self.on_cancel = None  # Set by the worker to interrupt the running question
+        self.done = threading.Event()
+
+    def wait(self, timeout: Optional[float] = None):
+        """Block until the job finishes"""
+        return self.done.wait(timeout)
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'priority': self.priority,
+            'subscribers': self.subscribers,
+            'params': self.params,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+
+
+class JobQueue:
+    """
+    Priority job queue with single-flight deduplication of identical requests
+    """
+
+    def __init__(self, max_finished: int = 500):
+        self.heap = []  # (-priority, sequence, job)
+        self.sequence = itertools.count()
+        self.in_flight = {}  # key -> queued or running job
+        self.jobs = {}  # job_id -> job
+        self.max_finished = max_finished
+        self.condition = threading.Condition()
+
+    def submit(self, key: tuple, params: dict, priority: int = 0):
+        """Queue a job, or attach to the identical one already in flight
+
+        Returns (job, deduplicated).
+        """
+        with self.condition:
+            job = self.in_flight.get(key)
+            if job:
+                job.subscribers += 1
+                if job.status == 'queued' and priority > job.priority:
+                    # Re-queue with the higher priority; the stale entry is skipped in get()
+                    job.priority = priority
+                    heapq.heappush(self.heap, (-priority, next(self.sequence), job))
+                    self.condition.notify()
+                return job, True
+
+            job = Job(key, params, priority)
+            self.in_flight[key] = job
+            self.jobs[job.id] = job
+            heapq.heappush(self.heap, (-priority, next(self.sequence), job))
+            self._trim_finished()
+            self.condition.notify()
+            return job, False
+
+    def get(self, timeout: Optional[float] = None):
+        """Pop the highest priority queued job and mark it running"""
+        deadline = time.time() + timeout if timeout is not None else None
+        with self.condition:
+            while True:
+                while self.heap:
+                    neg_priority, _, job = heapq.heappop(self.heap)
+                    if job.status == 'queued' and -neg_priority == job.priority:
+                        job.status = 'running'
+                        job.started_at = time.time()
+                        return job
+
+                remaining = deadline - time.time() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    return None
+                self.condition.wait(remaining)
+
+    def complete(self, job: Job, result=None, error: Optional[str] = None, status: Optional[str] = None):
+        """Finish a job and wake every caller waiting on it"""
+        with self.condition:
+            job.result = result
+            job.error = error
+            job.status = status or ('failed' if error else 'completed')
+            job.finished_at = time.time()
+            self.in_flight.pop(job.key, None)
+        job.done.set()
+
+    def cancel(self, job_id: str):
+        """Withdraw one caller from a job; the last caller to leave cancels it
+
+        A queued job is cancelled outright, a running one is asked to stop.
+        Returns the job, or None when it is unknown.
+        """
+        with self.condition:
+            job = self.jobs.get(job_id)
+            if not job or job.done.is_set():
+                return job
+
+            if job.subscribers > 1:
+                # Deduplicated callers are still waiting for this result
+                job.subscribers -= 1
+                return job
+
+            job.cancel_requested = True
+            if job.status == 'queued':
+                # The heap entry is skipped lazily in get()
+                job.status = 'cancelled'
+                job.error = 'cancelled'
+                job.finished_at = time.time()
+                self.in_flight.pop(job.key, None)
+                job.done.set()
+                return job
+            on_cancel = job.on_cancel
+
+        if on_cancel:
+            on_cancel()
+        return job
+
+    def get_job(self, job_id: str):
+        with self.condition:
+            return self.jobs.get(job_id)
+
+    def list_jobs(self):
+        with self.condition:
+            return list(self.jobs.values())
+
+    def _trim_finished(self):
+        """Forget the oldest finished jobs beyond max_finished"""
+        finished = [job for job in self.jobs.values() if job.done.is_set()]
+        for job in finished[:max(0, len(finished) - self.max_finished)]:
+            self.jobs.pop(job.id, None)
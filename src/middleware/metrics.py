@@ -0,0 +1,178 @@
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from middleware.aws_rate_limiter import create_client
+from middleware.inventory import resource_id
+from middleware.snapshot import SnapshotReader
+
+
+MAX_QUERIES_PER_CALL = 500  # GetMetricData limit
+
+# resource type -> (namespace, dimension, [(label, metric name, stat)])
+METRIC_DEFINITIONS = {
+    'ec2:instance': ('AWS/EC2', 'InstanceId', [
+        ('cpu_avg', 'CPUUtilization', 'Average'),
+        ('cpu_p95', 'CPUUtilization', 'p95'),
+        ('network_in_bytes', 'NetworkIn', 'Sum'),
+        ('network_out_bytes', 'NetworkOut', 'Sum'),
+    ]),
+    'ec2:volume': ('AWS/EBS', 'VolumeId', [
+        ('read_ops', 'VolumeReadOps', 'Sum'),
+        ('write_ops', 'VolumeWriteOps', 'Sum'),
+    ]),
+    'rds:db_instance': ('AWS/RDS', 'DBInstanceIdentifier', [
+        ('cpu_avg', 'CPUUtilization', 'Average'),
+        ('read_iops', 'ReadIOPS', 'Average'),
+        ('write_iops', 'WriteIOPS', 'Average'),
+        ('freeable_memory_bytes', 'FreeableMemory', 'Minimum'),
+        ('connections', 'DatabaseConnections', 'Maximum'),
+    ]),
+    'lambda:function': ('AWS/Lambda', 'FunctionName', [
+        ('duration_p50_ms', 'Duration', 'p50'),
+        ('duration_p95_ms', 'Duration', 'p95'),
+        ('duration_p99_ms', 'Duration', 'p99'),
+        ('invocations', 'Invocations', 'Sum'),
+        ('errors', 'Errors', 'Sum'),
+    ]),
+}
+
+
+def summarize_series(values: array):
+    """Summary statistics of one series"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return {
+        'min': ordered[0],
+        'avg': sum(ordered) / len(ordered),
+        'p95': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        'max': ordered[-1],
+        'points': len(ordered),
+    }
+
+
+class UtilizationMetrics:
+    """
+    Per-resource metric series kept as float32 arrays, with summaries
+    """
+
+    def __init__(self, period: int, start: datetime, end: datetime):
+        self.period = period
+        self.start = start
+        self.end = end
+        self.series = {}  # (resource type, resource id) -> {label: array('f')}
+
+    def add(self, resource_type: str, resource: str, label: str, values):
+        self.series.setdefault((resource_type, resource), {})[label] = array('f', values)
+
+    def summary(self, resource_type: str, resource: str):
+        return {label: summarize_series(values)
+                for label, values in self.series.get((resource_type, resource), {}).items()}
+
+    def to_prompt(self, max_resources: int = 100):
+        """Compact text for appending to a prompt"""
+        days = (self.end - self.start).days
+        lines = [f"CloudWatch utilization over the last {days} days "
+                 f"(period {self.period}s; values are min/avg/p95/max per period):"]
+        for count, (resource_type, resource) in enumerate(sorted(self.series)):
+            if count >= max_resources:
+                lines.append(f"... {len(self.series) - max_resources} more resources omitted")
+                break
+            stats = []
+            for label, summary in self.summary(resource_type, resource).items():
+                if summary:
+                    stats.append(f"{label} {summary['min']:.1f}/{summary['avg']:.1f}/"
+                                 f"{summary['p95']:.1f}/{summary['max']:.1f}")
+                else:
+                    stats.append(f"{label} no data")
+            lines.append(f"- {resource_type} {resource}: {'; '.join(stats)}")
+        return '\n'.join(lines)
+
+
+class MetricsCollector:
+    """
+    Batched CloudWatch GetMetricData collector for inventoried resources
+    """
+
+    def __init__(self, region: str, account: Optional[str] = None, days: int = 14,
+                 period: int = 3600, max_workers: int = 4):
+        self.region = region
+        self.account = account
+        self.days = days
+        self.period = period
+        self.max_workers = max_workers
+
+    def _build_queries(self, snapshot_path: str, resource_types):
+        """One MetricDataQuery per (resource, metric), plus an id -> target lookup"""
+        queries, targets = [], {}
+        with SnapshotReader(snapshot_path) as reader:
+            for resource_type in resource_types:
+                if resource_type not in METRIC_DEFINITIONS:
+                    continue
+                namespace, dimension, metrics = METRIC_DEFINITIONS[resource_type]
+                for resource in reader.iter_resources(resource_type):
+                    if resource_type == 'ec2:instance' and resource.get('State', {}).get('Name') != 'running':
+                        continue
+                    identifier = resource_id(resource_type, resource)
+                    for label, metric_name, stat in metrics:
+                        query_id = f"m{len(queries)}"
+                        queries.append({
+                            'Id': query_id,
+                            'MetricStat': {
+                                'Metric': {
+                                    'Namespace': namespace,
+                                    'MetricName': metric_name,
+                                    'Dimensions': [{'Name': dimension, 'Value': identifier}],
+                                },
+                                'Period': self.period,
+                                'Stat': stat,
+                            },
+                            'ReturnData': True,
+                        })
+                        targets[query_id] = (resource_type, identifier, label)
+        return queries, targets
+
+    def _fetch_batch(self, client, batch, start, end):
+        """Run one GetMetricData batch, following NextToken pages"""
+        results = {}
+        kwargs = {'MetricDataQueries': batch, 'StartTime': start, 'EndTime': end, 'ScanBy': 'TimestampAscending'}
+        while True:
+            response = client.get_metric_data(**kwargs)
+            for result in response.get('MetricDataResults', []):
+                results.setdefault(result['Id'], []).extend(result.get('Values', []))
+            if not response.get('NextToken'):
+                return results
+            kwargs['NextToken'] = response['NextToken']
+
+    def collect(self, snapshot_path: str, resource_types=None):
+        """Fetch metrics for every resource in the snapshot's relevant sections"""
+        resource_types = list(resource_types or METRIC_DEFINITIONS)
+        queries, targets = self._build_queries(snapshot_path, resource_types)
+
+        end = datetime.now(tz=timezone.utc).replace(minute=0, second=0, microsecond=0)
+        start = end - timedelta(days=self.days)
+        metrics = UtilizationMetrics(self.period, start, end)
+        if not queries:
+            return metrics
+
+        batches = [queries[index:index + MAX_QUERIES_PER_CALL]
+                   for index in range(0, len(queries), MAX_QUERIES_PER_CALL)]
+        print(f"[INFO] 📈 Fetching {len(queries)} metric series in {len(batches)} GetMetricData batches...")
+
+        client = create_client('cloudwatch', self.region, self.account)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self._fetch_batch, client, batch, start, end) for batch in batches]
+            for future in futures:
+                try:
+                    results = future.result()
+                except Exception as e:
+                    print(f"[WARNING] GetMetricData batch failed: {e}")
+                    continue
+                for query_id, values in results.items():
+                    resource_type, identifier, label = targets[query_id]
+                    metrics.add(resource_type, identifier, label, values)
+
+        print(f"[INFO] ✅ Collected utilization for {len(metrics.series)} resources")
+        return metrics
@@ -0,0 +1,153 @@
+import asyncio
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Optional
+
+
+class ProgressServer:
+    """
+    WebSocket server that broadcasts analysis progress events to subscribers
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8765,
+                 client_queue_size: int = 1000, history_size: int = 200):
+        self.host = host
+        self.port = port
+        self.client_queue_size = client_queue_size
+        self.history = deque(maxlen=history_size)  # Replayed to late subscribers
+        self.clients = {}  # websocket -> asyncio.Queue
+        self.dropped = {}  # websocket -> dropped event count
+        self.loop = None
+        self.server = None
+        self.server_thread = None
+        self._ready = threading.Event()
+
+    def start(self):
+        """Start the server in a background thread"""
+        try:
+            import websockets  # noqa: F401
+        except ImportError:
+            print("[ERROR] ❌ 'websockets' package is required for the progress server")
+            return False
+
+        self.server_thread = threading.Thread(target=self._run, daemon=True)
+        self.server_thread.start()
+        self._ready.wait(timeout=5)
+        if self.server is None:
+            print(f"[ERROR] ❌ Failed to start progress server on {self.host}:{self.port}")
+            return False
+
+        print(f"[INFO] 📡 Progress server listening on ws://{self.host}:{self.port}")
+        return True
+
+    def _run(self):
+        """Event loop for the server thread"""
+        import websockets
+
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.server = self.loop.run_until_complete(
+                websockets.serve(self._handler, self.host, self.port)
+            )
+        except Exception as e:
+            print(f"[WARNING] Progress server error: {e}")
+            self._ready.set()
+            return
+
+        self._ready.set()
+        self.loop.run_forever()
+
+        # Shutdown after stop()
+        self.server.close()
+        self.loop.run_until_complete(self.server.wait_closed())
+        self.loop.close()
+
+    async def _handler(self, websocket, path=None):
+        """Serve one subscriber from its own bounded queue"""
+        client_queue = asyncio.Queue(maxsize=self.client_queue_size)
+        for message in self.history:
+            self._enqueue(client_queue, websocket, message)
+
+        self.clients[websocket] = client_queue
+        self.dropped[websocket] = 0
+        try:
+            while True:
+                message = await client_queue.get()
+                await websocket.send(message)
+        except Exception:
+            pass  # Connection closed by the subscriber
+        finally:
+            self.clients.pop(websocket, None)
+            self.dropped.pop(websocket, None)
+
+    def _enqueue(self, client_queue, websocket, message):
+        """Queue a message for one client, dropping its oldest event when full"""
+        if client_queue.full():
+            try:
+                client_queue.get_nowait()
+                self.dropped[websocket] = self.dropped.get(websocket, 0) + 1
+            except asyncio.QueueEmpty:
+                pass
+        client_queue.put_nowait(message)
+
+    def _broadcast(self, message):
+        """Fan a message out to every client (runs on the server loop)"""
+        self.history.append(message)
+        for websocket, client_queue in list(self.clients.items()):
+            self._enqueue(client_queue, websocket, message)
+
+    def publish(self, run_id: str, event: str, **data):
+        """Publish an event from any thread without blocking the caller"""
+        if not self.loop or not self.loop.is_running():
+            return
+
+        message = json.dumps({
+            'run_id': run_id,
+            'event': event,
+            'timestamp': time.time(),
+            **data
+        }, ensure_ascii=False)
+        self.loop.call_soon_threadsafe(self._broadcast, message)
+
+    def stop(self):
+        """Stop the server and disconnect subscribers"""
+        if self.loop and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        if self.server_thread and self.server_thread.is_alive():
+            self.server_thread.join(timeout=5)
+        print("[INFO] 🛑 Progress server stopped")
+
+
+class ProgressReporter:
+    """
+    Per-run helper that tags events with a run id
+    """
+
+    def __init__(self, server: Optional[ProgressServer], title: str = ""):
+        self.server = server
+        self.run_id = uuid.uuid4().hex[:12]
+        self.title = title
+
+    def phase(self, name: str, **data):
+        self._publish('phase', phase=name, title=self.title, **data)
+
+    def line(self, text: str, line_number: int):
+        self._publish('line', text=text, line=line_number)
+
+    def progress(self, lines: int, chars: int, elapsed: float):
+        self._publish('progress', lines=lines, chars=chars, elapsed=round(elapsed, 1))
+
+    def completed(self, lines: int, chars: int, elapsed: float, report_path: Optional[str] = None):
+        self._publish('completed', title=self.title, lines=lines, chars=chars,
+                      elapsed=round(elapsed, 1), report_path=report_path)
+
+    def error(self, message: str):
+        self._publish('error', title=self.title, message=message)
+
+    def _publish(self, event: str, **data):
+        if self.server:
+            self.server.publish(self.run_id, event, **data)
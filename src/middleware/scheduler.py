@@ -0,0 +1,280 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from middleware.analysis_registry import get_analysis
+from middleware.change_detector import CloudTrailChangeDetector, directory_fingerprint
+
+
+class CronSchedule:
+    """
+    Five-field cron expression (minute hour day-of-month month day-of-week)
+    """
+
+    FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]  # Day-of-week 7 is Sunday, folded to 0
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Invalid cron expression: {expression}")
+
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, self.weekdays = [
+            self._parse_field(field, low, high) for field, (low, high) in zip(fields, self.FIELD_RANGES)
+        ]
+        # Standard cron: when both day fields are restricted, either may match
+        self.days_restricted = fields[2] != '*'
+        self.weekdays_restricted = fields[4] != '*'
+
+    def _parse_field(self, field, low, high):
+        values = set()
+        for part in field.split(','):
+            step = 1
+            stepped = '/' in part
+            if stepped:
+                part, step = part.split('/')
+                step = int(step)
+
+            if part == '*':
+                start, end = low, high
+            elif '-' in part:
+                start, end = (int(value) for value in part.split('-'))
+            else:
+                start = int(part)
+                end = high if stepped else start  # 5/10 means 5-<max>/10
+
+            if start < low or end > high or start > end or step < 1:
+                raise ValueError(f"Cron field out of range: {field}")
+            values.update(range(start, end + 1, step))
+
+        if high == 7 and 7 in values:
+            values.discard(7)
+            values.add(0)
+        return values
+
+    def _day_matches(self, moment):
+        weekday = (moment.weekday() + 1) % 7  # cron: Sunday = 0
+        day_match = moment.day in self.days
+        weekday_match = weekday in self.weekdays
+        if self.days_restricted and self.weekdays_restricted:
+            return day_match or weekday_match
+        return day_match and weekday_match
+
+    def next_after(self, moment: datetime):
+        """Next matching minute strictly after moment"""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366)
+        while candidate < limit:
+            if candidate.month not in self.months or not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+                continue
+            if candidate.minute in self.minutes:
+                return candidate
+            candidate += timedelta(minutes=1)
+        raise ValueError(f"Cron expression never matches: {self.expression}")
+
+
+class ScheduleEntry:
+    """
+    A recurring analysis for one (account, region, analysis)
+    """
+
+    def __init__(self, config: dict, jitter_window: int = 600):
+        if not isinstance(config, dict) or 'cron' not in config:
+            raise ValueError(f"Schedule entry needs a 'cron' field: {config}")
+        self.cron = CronSchedule(config['cron'])
+        self.request = {key: value for key, value in config.items() if key != 'cron'}
+        self.request.setdefault('region', 'ap-northeast-2')
+        self.request.setdefault('language', 'ko')
+
+        # Fail at load time rather than on the scheduler thread
+        spec = get_analysis(self.request.get('analysis'))
+        if spec.input_kind == 'directory' and not self.request.get('directory'):
+            raise ValueError(f"'directory' is required for {spec.key} schedules")
+        if self.request['language'] not in ('ko', 'en'):
+            raise ValueError(f"Unsupported language: {self.request['language']}")
+        self.key = '|'.join(str(self.request.get(name) or '') for name in
+                            ('account', 'region', 'analysis', 'language', 'directory'))
+
+        # Stable per-entry offset so entries sharing a cron time do not start together
+        digest = hashlib.sha256(self.key.encode('utf-8')).hexdigest()
+        self.jitter = int(digest[:8], 16) % jitter_window if jitter_window else 0
+        self.next_run = None
+
+    def schedule_next(self, after: datetime):
+        self.next_run = self.cron.next_after(after) + timedelta(seconds=self.jitter)
+
+
+class AnalysisScheduler:
+    """
+    Submit recurring analyses to the daemon, skipping or shortening runs when nothing changed
+    """
+
+    def __init__(self, daemon, entries, state_file: str = '.archiq/schedule_state.json',
+                 change_detector: Optional[CloudTrailChangeDetector] = None):
+        self.daemon = daemon
+        self.entries = entries
+        self.state_file = state_file
+        self.change_detector = change_detector or CloudTrailChangeDetector()
+        self.state = self._load_state()
+        self.pending = {}  # entry key -> (entry, job, run state)
+        self.is_running = False
+        self.thread = None
+
+    @classmethod
+    def from_file(cls, daemon, path: str, **kwargs):
+        """Load schedule entries from a JSON file: {"schedules": [...]} or [...]"""
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        schedules = config.get('schedules', []) if isinstance(config, dict) else config
+        jitter_window = config.get('jitter_window', 600) if isinstance(config, dict) else 600
+        entries = []
+        for index, entry in enumerate(schedules):
+            try:
+                entries.append(ScheduleEntry(entry, jitter_window))
+            except ValueError as e:
+                raise ValueError(f"Invalid schedule entry #{index + 1} in {path}: {e}")
+        return cls(daemon, entries, **kwargs)
+
+    def _load_state(self):
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_state(self):
+        os.makedirs(os.path.dirname(self.state_file) or '.', exist_ok=True)
+        temp_file = f"{self.state_file}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+        os.replace(temp_file, self.state_file)
+
+    def start(self):
+        """Start the scheduling thread"""
+        now = datetime.now()
+        for entry in self.entries:
+            entry.schedule_next(now)
+            print(f"[INFO] 🗓️ Scheduled {entry.key} at {entry.next_run:%Y-%m-%d %H:%M:%S}")
+
+        self.is_running = True
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.is_running = False
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=2)
+
+    def _loop(self):
+        while self.is_running:
+            now = datetime.now()
+            for entry in self.entries:
+                if entry.next_run <= now:
+                    if entry.key in self.pending:
+                        print(f"[WARNING] Previous run of {entry.key} still in progress, skipping this slot")
+                    else:
+                        try:
+                            self._run_entry(entry)
+                        except Exception as e:
+                            # One broken entry must not stop every other schedule
+                            print(f"[ERROR] ❌ Scheduled run of {entry.key} failed: {e}")
+                    entry.schedule_next(now)
+            self._collect_finished()
+            time.sleep(5)
+
+    def _run_entry(self, entry):
+        """Decide whether an entry needs a full, incremental or no run"""
+        request = dict(entry.request)
+        previous = self.state.get(entry.key, {})
+        started = time.time()
+
+        try:
+            question_hash = self._question_hash(request)
+        except Exception as e:
+            print(f"[ERROR] ❌ Cannot build question for {entry.key}: {e}")
+            return
+
+        run_state = {'question_hash': question_hash, 'started': started}
+        has_baseline = (previous.get('last_success') and previous.get('question_hash') == question_hash
+                        and previous.get('report_path') and os.path.exists(previous['report_path']))
+
+        if get_analysis(request['analysis']).input_kind == 'directory':
+            fingerprint = directory_fingerprint(request['directory'])
+            run_state['fingerprint'] = fingerprint
+            if has_baseline and previous.get('fingerprint') == fingerprint:
+                return self._record_skip(entry, previous)
+
+        elif has_baseline:
+            changes = self.change_detector.changes_since(request.get('account'), request['region'],
+                                                         previous['last_success'])
+            if changes == []:
+                return self._record_skip(entry, previous)
+            # None: unknown or too many changes to list, so run the full analysis
+            if changes:
+                request['context'] = self._incremental_context(previous['report_path'], changes)
+                run_state['mode'] = 'incremental'
+
+        try:
+            job, deduplicated = self.daemon.submit(request)
+        except ValueError as e:
+            print(f"[ERROR] ❌ Invalid schedule entry {entry.key}: {e}")
+            return
+
+        run_state.setdefault('mode', 'full')
+        print(f"[INFO] ⏰ Scheduled {run_state['mode']} run for {entry.key}: job {job.id}"
+              f"{' (merged)' if deduplicated else ''}")
+        self.pending[entry.key] = (entry, job, run_state)
+
+    def _record_skip(self, entry, previous):
+        print(f"[INFO] ⏭️ No changes since last run, skipping {entry.key}")
+        previous['last_skipped'] = time.time()
+        previous['skipped_runs'] = previous.get('skipped_runs', 0) + 1
+        self.state[entry.key] = previous
+        self._save_state()
+
+    def _collect_finished(self):
+        for key, (entry, job, run_state) in list(self.pending.items()):
+            if not job.done.is_set():
+                continue
+
+            del self.pending[key]
+            record = self.state.get(key, {})
+            record['last_status'] = job.status
+            record['last_run'] = run_state['started']
+            if job.status == 'completed':
+                record.update({
+                    'last_success': run_state['started'],
+                    'question_hash': run_state['question_hash'],
+                    'mode': run_state['mode'],
+                })
+                if job.result and job.result.get('report_path'):
+                    record['report_path'] = job.result['report_path']
+                if 'fingerprint' in run_state:
+                    record['fingerprint'] = run_state['fingerprint']
+            self.state[key] = record
+            self._save_state()
+
+    def _question_hash(self, request):
+        question = self.daemon.question_for(request)
+        return hashlib.sha256(question.encode('utf-8')).hexdigest()
+
+    def _incremental_context(self, report_path, changes):
+        """Ask Q to update the previous report with only the changed resources"""
+        lines = [
+            f"A previous report for this analysis exists at {report_path}.",
+            "Since then only the following AWS write events occurred. Re-examine only the affected "
+            "resources, reuse the unchanged findings from the previous report, and write the updated "
+            "report in the same format:",
+        ]
+        for change in changes:
+            resources = ', '.join(name for name in change['resources'] if name) or '-'
+            lines.append(f"- {change['time']} {change['source']} {change['event']}: {resources}")
+        return '\n'.join(lines)
@@ -0,0 +1,448 @@
+import ctypes
+import ctypes.util
+import errno
+import hashlib
+import json
+import os
+import re
+import select
+import struct
+import time
+from typing import Optional
+
+from middleware.amazon_q_hook import QuestionCancelled
+from middleware.analysis_registry import PromptTemplate, get_analysis, read_prompt
+
+
+# Service Screener writes <account id>/<service>.html (and per-service folders); shared assets and
+# account-wide pages are not tied to one service and would re-trigger everything on every run
+IGNORED_DIRS = {'res', '__pycache__'}
+INGESTED_EXTENSIONS = {'.json', '.html', '.csv', '.txt'}
+AGGREGATE_FILES = {'index', 'cpfindings', 'api-full', 'api-raw', 'workitem'}
+ACCOUNT_ID_PATTERN = re.compile(r'^\d{12}$')
+
+HASH_CHUNK_SIZE = 64 * 1024
+
+# inotify(7)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, 'O_CLOEXEC', 0o2000000)
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, name length
+
+
+def service_for(relpath: str):
+    """Service key ('<account>/<service>' or '<service>') a results file belongs to, or None"""
+    parts = relpath.replace(os.sep, '/').split('/')
+    if any(part in IGNORED_DIRS or part.startswith('.') for part in parts[:-1]):
+        return None
+    stem, extension = os.path.splitext(parts[-1])
+    if extension.lower() not in INGESTED_EXTENSIONS:
+        return None
+
+    prefix = []
+    if len(parts) > 1 and ACCOUNT_ID_PATTERN.match(parts[0]):
+        prefix, parts = [parts[0]], parts[1:]
+    name = (parts[0] if len(parts) > 1 else stem).lower()
+    if name in AGGREGATE_FILES:
+        return None
+    return '/'.join(prefix + [name])
+
+
+def file_sha256(path: str):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FileHashIndex:
+    """
+    Content hashes of every file under a directory, re-hashed only when size or mtime moved
+    """
+
+    def __init__(self, directory: str, entries: Optional[dict] = None):
+        self.directory = directory
+        self.entries = entries or {}  # relpath -> [size, mtime_ns, sha256]
+
+    def _walk(self):
+        for root, dirs, files in os.walk(self.directory):
+            dirs[:] = [name for name in dirs if not name.startswith('.')]
+            for name in files:
+                yield os.path.relpath(os.path.join(root, name), self.directory)
+
+    def refresh(self, relpaths=None):
+        """Update hashes for the given paths (or the whole tree); returns paths whose content changed"""
+        if relpaths is None:
+            relpaths = set(self._walk()) | set(self.entries)
+
+        changed = set()
+        for relpath in relpaths:
+            try:
+                stat = os.stat(os.path.join(self.directory, relpath))
+            except OSError:
+                if self.entries.pop(relpath, None):
+                    changed.add(relpath)
+                continue
+
+            previous = self.entries.get(relpath)
+            if previous and previous[0] == stat.st_size and previous[1] == stat.st_mtime_ns:
+                continue
+            try:
+                digest = file_sha256(os.path.join(self.directory, relpath))
+            except OSError:
+                continue  # Removed or unreadable mid-write; the next event picks it up
+            self.entries[relpath] = [stat.st_size, stat.st_mtime_ns, digest]
+            if not previous or previous[2] != digest:
+                changed.add(relpath)
+        return changed
+
+    def files_for(self, service: str):
+        return sorted(relpath for relpath in self.entries if service_for(relpath) == service)
+
+    def services(self):
+        return {service_for(relpath) for relpath in self.entries} - {None}
+
+
+class InotifyWatcher:
+    """
+    Recursive inotify watch on a directory (Linux only), read through ctypes
+    """
+
+    def __init__(self, directory: str):
+        library = ctypes.util.find_library('c')
+        if not library:
+            raise OSError("libc not found")
+        self.libc = ctypes.CDLL(library, use_errno=True)
+        self.directory = directory
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches = {}  # watch descriptor -> relative directory
+        self.buffer = b''
+        self._add_tree('')
+
+    def _add_watch(self, reldir: str):
+        path = os.path.join(self.directory, reldir)
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if error == errno.ENOSPC:
+                raise OSError(error, "inotify watch limit reached (fs.inotify.max_user_watches)")
+            return
+        self.watches[wd] = reldir
+
+    def _add_tree(self, reldir: str):
+        """Watch a directory and everything below it; returns the files already in it"""
+        files = set()
+        for root, dirs, names in os.walk(os.path.join(self.directory, reldir)):
+            dirs[:] = [name for name in dirs if not name.startswith('.')]
+            relroot = os.path.relpath(root, self.directory)
+            self._add_watch('' if relroot == '.' else relroot)
+            files.update(os.path.relpath(os.path.join(root, name), self.directory) for name in names)
+        return files
+
+    def changes(self, timeout: float):
+        """Paths touched since the last call (empty when nothing happened), or None after an overflow"""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        try:
+            self.buffer += os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed, overflow = set(), False
+        while len(self.buffer) >= EVENT_HEADER.size:
+            wd, mask, _, length = EVENT_HEADER.unpack_from(self.buffer)
+            end = EVENT_HEADER.size + length
+            if len(self.buffer) < end:
+                break
+            name = os.fsdecode(self.buffer[EVENT_HEADER.size:end].rstrip(b'\0'))
+            self.buffer = self.buffer[end:]
+
+            if mask & IN_Q_OVERFLOW:
+                overflow = True
+                continue
+            reldir = self.watches.get(wd)
+            if reldir is None:
+                continue
+            if mask & IN_DELETE_SELF:
+                self.watches.pop(wd, None)
+                continue
+
+            relpath = os.path.join(reldir, name) if reldir else name
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    # Files may land before the new directory is watched, so report what is already there
+                    changed.update(self._add_tree(relpath))
+                else:
+                    changed.add(relpath + os.sep)  # Expanded to the indexed files below it by the caller
+            else:
+                changed.add(relpath)
+        return None if overflow else changed
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingWatcher:
+    """
+    Portable fallback: compare file sizes and mtimes every interval
+    """
+
+    def __init__(self, directory: str, interval: float = 2.0):
+        self.directory = directory
+        self.interval = interval
+        self.stats = self._scan()
+        self.next_scan = time.time() + interval
+
+    def _scan(self):
+        stats = {}
+        for root, dirs, files in os.walk(self.directory):
+            dirs[:] = [name for name in dirs if not name.startswith('.')]
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                stats[os.path.relpath(path, self.directory)] = (stat.st_size, stat.st_mtime_ns)
+        return stats
+
+    def changes(self, timeout: float):
+        wait = self.next_scan - time.time()
+        if wait > timeout:
+            time.sleep(timeout)
+            return set()
+        time.sleep(max(0.0, wait))
+        self.next_scan = time.time() + self.interval
+
+        stats = self._scan()
+        changed = {relpath for relpath in stats.keys() | self.stats.keys()
+                   if stats.get(relpath) != self.stats.get(relpath)}
+        self.stats = stats
+        return changed
+
+    def close(self):
+        pass
+
+
+def create_file_watcher(directory: str, poll_interval: float = 2.0):
+    """inotify where available, polling otherwise"""
+    try:
+        watcher = InotifyWatcher(directory)
+        print(f"[INFO] 👀 Watching {directory} with inotify")
+        return watcher
+    except (OSError, AttributeError) as e:
+        # AttributeError: libc without inotify symbols (macOS, Windows)
+        print(f"[INFO] 👀 inotify unavailable ({e}); polling {directory} every {poll_interval:.0f}s")
+        return PollingWatcher(directory, poll_interval)
+
+
+class ServiceScreenerWatcher:
+    """
+    Keep a Service Screener review up to date while results are written, re-analyzing only changed services
+    """
+
+    def __init__(self, hook, directory: str, language: str = 'ko',
+                 state_file: str = '.archiq/screener_watch.json', settle: float = 3.0,
+                 poll_interval: float = 2.0, retry_delay: float = 60.0, question_timeout: Optional[float] = None):
+        self.hook = hook
+        self.directory = os.path.abspath(directory)
+        self.language = language
+        self.state_file = state_file
+        self.settle = settle  # Seconds without events before a batch of changes is processed
+        self.poll_interval = poll_interval
+        self.retry_delay = retry_delay
+        self.question_timeout = question_timeout
+
+        spec = get_analysis('service_screener')
+        slug = f"{os.path.basename(self.directory) or 'root'}_{hashlib.sha256(self.directory.encode('utf-8')).hexdigest()[:8]}"
+        self.summary_dir = os.path.join(spec.output_dir(language), 'services', f"{slug}_{language}")
+        self.report_path = os.path.join(spec.output_dir(language), f"aws_service_screener_watch_{slug}_{language}.html")
+
+        self.state_key = f"{self.directory}|{language}"
+        self.state = self._load_state()
+        record = self.state.get(self.state_key, {})
+        self.index = FileHashIndex(self.directory, record.get('files'))
+        self.pending = set(record.get('pending', []))  # Services whose last analysis did not finish
+        self.unreviewed = set(record.get('unreviewed', []))  # Analyzed services not yet in the combined review
+        self.retry_at = 0
+        self.templates = {}
+
+    def _load_state(self):
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_state(self):
+        self.state[self.state_key] = {
+            'files': self.index.entries,
+            'pending': sorted(self.pending),
+            'unreviewed': sorted(self.unreviewed),
+        }
+        os.makedirs(os.path.dirname(self.state_file) or '.', exist_ok=True)
+        temp_file = f"{self.state_file}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+        os.replace(temp_file, self.state_file)
+
+    def _template(self, filename, placeholders):
+        if filename not in self.templates:
+            self.templates[filename] = PromptTemplate(read_prompt(filename, self.language), placeholders)
+        return self.templates[filename]
+
+    def summary_path(self, service: str):
+        return os.path.join(self.summary_dir, f"{service.replace('/', '_')}.md")
+
+    def run(self):
+        """Analyze what changed since the last run, then follow the directory until interrupted"""
+        if not os.path.isdir(self.directory):
+            raise ValueError(f"Directory not found: {self.directory}")
+
+        # Watch before the initial scan so nothing written in between is missed
+        watcher = create_file_watcher(self.directory, self.poll_interval)
+        try:
+            first_run = self.state_key not in self.state
+            changed = self.index.refresh()
+            if first_run:
+                self.pending |= self.index.services()
+            elif not os.path.exists(self.report_path):
+                self.unreviewed |= self.index.services() - self.pending
+            self._sync(changed)
+
+            print(f"[INFO] 👀 Waiting for Service Screener changes (Ctrl-C to stop)...")
+            while True:
+                paths = watcher.changes(timeout=1.0)
+                if paths is None or paths:
+                    paths = self._settle(watcher, paths)
+                    self._sync(self.index.refresh(self._expand(paths)))
+                elif (self.pending or self.unreviewed) and time.time() >= self.retry_at:
+                    self._sync(set())
+        finally:
+            watcher.close()
+            self._save_state()
+
+    def _settle(self, watcher, paths):
+        """Keep collecting events until the directory has been quiet for settle seconds"""
+        quiet_since = time.time()
+        while time.time() - quiet_since < self.settle:
+            more = watcher.changes(timeout=0.5)
+            if more is None or more:
+                paths = None if paths is None or more is None else paths | more
+                quiet_since = time.time()
+        return paths
+
+    def _expand(self, paths):
+        """Turn removed-directory prefixes into the indexed files under them; None means rescan everything"""
+        if paths is None:
+            return None
+        expanded = set()
+        for path in paths:
+            if path.endswith(os.sep):
+                expanded.update(relpath for relpath in self.index.entries if relpath.startswith(path))
+            else:
+                expanded.add(path)
+        return expanded
+
+    def _sync(self, changed_paths):
+        """Re-analyze affected services, then refresh the combined review"""
+        self.pending |= {service_for(relpath) for relpath in changed_paths} - {None}
+        if self.pending:
+            print(f"[INFO] 🔄 {len(self.pending)} service(s) to analyze: {', '.join(sorted(self.pending))}")
+        for service in sorted(self.pending):
+            if self._analyze_service(service):
+                self.pending.discard(service)
+                self.unreviewed.add(service)
+                self._save_state()
+
+        if self.unreviewed and self._update_review(sorted(self.unreviewed)):
+            self.unreviewed.clear()
+        if self.pending or self.unreviewed:
+            self.retry_at = time.time() + self.retry_delay
+            print(f"[WARNING] Retrying {', '.join(sorted(self.pending | self.unreviewed))} in {self.retry_delay:.0f}s")
+        self._save_state()
+
+    def _analyze_service(self, service: str):
+        """Summarize one service's result files; returns False when it should be retried"""
+        files = self.index.files_for(service)
+        summary_path = self.summary_path(service)
+        if not files:
+            print(f"[INFO] 🗑️ {service}: results removed")
+            if os.path.exists(summary_path):
+                os.remove(summary_path)
+            return True
+
+        os.makedirs(self.summary_dir, exist_ok=True)
+        started = time.time()
+        question = self._template('service_screener_service.md', ['DIR_PATH', 'SERVICE', 'FILES', 'OUTPUT_PATH']).render({
+            'DIR_PATH': self.directory,
+            'SERVICE': service,
+            'FILES': ', '.join(os.path.join(self.directory, relpath) for relpath in files),
+            'OUTPUT_PATH': summary_path,
+        })
+
+        print(f"[INFO] 🔍 Analyzing {service} ({len(files)} files)...")
+        try:
+            lines = list(self.hook.ask_question_stream(question, timeout=self.question_timeout))
+        except QuestionCancelled as e:
+            print(f"[WARNING] {service} analysis stopped: {e}")
+            return False
+        except Exception as e:
+            print(f"[WARNING] {service} analysis failed: {e}")
+            return False
+
+        if not os.path.exists(summary_path) or os.path.getmtime(summary_path) < started:
+            if not lines:
+                print(f"[WARNING] {service}: no summary was produced")
+                return False
+            # Q answered inline instead of writing the file; keep the answer as the summary
+            with open(summary_path, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(lines) + '\n')
+        print(f"[INFO] ✅ {service} summary saved: {summary_path}")
+        return True
+
+    def _update_review(self, updated):
+        """Rebuild the combined review from the per-service summaries; returns False when it should be retried"""
+        summaries = sorted(name for name in os.listdir(self.summary_dir) if name.endswith('.md')) \
+            if os.path.isdir(self.summary_dir) else []
+        if not summaries:
+            print("[INFO] No service summaries left; combined review not updated")
+            return True
+
+        question = self._template('service_screener_combine.md',
+                                  ['SUMMARY_DIR', 'SERVICES', 'CHANGED', 'REPORT_PATH']).render({
+            'SUMMARY_DIR': self.summary_dir,
+            'SERVICES': ', '.join(summaries),
+            'CHANGED': ', '.join(updated),
+            'REPORT_PATH': self.report_path,
+        })
+
+        print(f"[INFO] 🧩 Updating combined review ({len(summaries)} services, {len(updated)} changed)...")
+        started = time.time()
+        try:
+            for _ in self.hook.ask_question_stream(question, timeout=self.question_timeout):
+                pass
+        except Exception as e:
+            print(f"[WARNING] Combined review update failed: {e}")
+            return False
+
+        if not os.path.exists(self.report_path) or os.path.getmtime(self.report_path) < started:
+            print("[WARNING] Combined review was not written; will retry")
+            return False
+        print(f"[INFO] 📄 Combined review: {self.report_path}")
+        return True
@@ -0,0 +1,87 @@
+import threading
+from contextlib import contextmanager
+from typing import Optional
+
+from middleware.amazon_q_hook import AmazonQDeveloperHook, QuestionCancelled
+
+
+class QChatSessionPool:
+    """
+    Shared pool of warm qchat hooks, one AWS account (profile) per hook
+    """
+
+    def __init__(self, max_sessions: int = 2, transport: str = 'pipe'):
+        self.max_sessions = max_sessions
+        self.transport = transport
+        self.idle = []  # [(account, hook)] - most recently used last
+        self.busy = 0
+        self.condition = threading.Condition()
+
+    def _create_hook(self, account: Optional[str]):
+        """Create a hook whose qchat process runs with the account's profile"""
+        env = {'AWS_PROFILE': account} if account else None
+        return AmazonQDeveloperHook(env=env, transport=self.transport)
+
+    def acquire(self, account: Optional[str] = None):
+        """Borrow a hook for account, waiting while the pool is exhausted"""
+        evicted_hook = None
+        with self.condition:
+            while True:
+                # Prefer a warm session for the same account
+                for index in range(len(self.idle) - 1, -1, -1):
+                    if self.idle[index][0] == account:
+                        _, hook = self.idle.pop(index)
+                        self.busy += 1
+                        return hook
+
+                if self.busy + len(self.idle) < self.max_sessions:
+                    self.busy += 1
+                    break
+
+                if self.idle:
+                    # Evict the least recently used session of another account
+                    evicted_account, evicted_hook = self.idle.pop(0)
+                    print(f"[INFO] ♻️ Evicting idle session for account: {evicted_account or 'default'}")
+                    self.busy += 1
+                    break
+
+                self.condition.wait()
+
+        # Terminating qchat takes seconds; do it without blocking other workers
+        if evicted_hook:
+            evicted_hook.end_interactive_session_with_tools()
+        return self._create_hook(account)
+
+    def release(self, hook, account: Optional[str] = None, healthy: bool = True):
+        """Return a hook to the pool, discarding it when it is no longer usable"""
+        keep = healthy and hook.interactive_session
+        with self.condition:
+            self.busy -= 1
+            if keep:
+                self.idle.append((account, hook))
+            self.condition.notify()
+        if not keep:
+            hook.end_interactive_session_with_tools()
+
+    @contextmanager
+    def session(self, account: Optional[str] = None):
+        """Context manager around acquire/release"""
+        hook = self.acquire(account)
+        healthy = True
+        try:
+            yield hook
+        except QuestionCancelled:
+            # The question was interrupted cleanly; the hook drops its session itself if qchat died
+            raise
+        except Exception:
+            healthy = False
+            raise
+        finally:
+            self.release(hook, account, healthy)
+
+    def close(self):
+        """Terminate every idle session"""
+        with self.condition:
+            idle, self.idle = self.idle, []
+        for _, hook in idle:
+            hook.end_interactive_session_with_tools()
@@ -0,0 +1,160 @@
+import json
+import mmap
+import os
+import struct
+import tempfile
+import time
+import zlib
+from typing import Optional
+
+
+MAGIC = b'ARQSNAP1'
+HEADER = struct.Struct('<8sI')  # magic, index length
+CHUNK_SIZE = 64 * 1024
+
+
+class SnapshotWriter:
+    """
+    Write a resource inventory as zlib-compressed JSON Lines sections, one per resource type
+
+    Layout: magic | index length | JSON index | section data. The index maps each resource
+    type to the offset (relative to the start of section data), compressed length and
+    resource count of its section, so readers can decode one section without the rest.
+    """
+
+    def __init__(self, path: str, metadata: Optional[dict] = None, level: int = 6):
+        self.path = path
+        self.metadata = metadata or {}
+        self.level = level
+        self.sections = {}
+        self.data_file = tempfile.TemporaryFile(dir=os.path.dirname(os.path.abspath(path)))
+        self.position = 0
+
+    def add_section(self, resource_type: str, resources):
+        """Stream an iterable of resources into a compressed section"""
+        if resource_type in self.sections:
+            raise ValueError(f"Duplicate snapshot section: {resource_type}")
+
+        compressor = zlib.compressobj(self.level)
+        offset, count, raw_length = self.position, 0, 0
+        for resource in resources:
+            line = (json.dumps(resource, ensure_ascii=False, separators=(',', ':'), default=str) + '\n').encode('utf-8')
+            raw_length += len(line)
+            count += 1
+            self._write(compressor.compress(line))
+        self._write(compressor.flush())
+
+        self.sections[resource_type] = {
+            'offset': offset,
+            'length': self.position - offset,
+            'count': count,
+            'raw_length': raw_length,
+        }
+
+    def _write(self, data: bytes):
+        if data:
+            self.data_file.write(data)
+            self.position += len(data)
+
+    def close(self):
+        """Write header, index and section data to the final path"""
+        index = json.dumps({
+            'version': 1,
+            'created_at': time.time(),
+            'metadata': self.metadata,
+            'sections': self.sections,
+        }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, len(index)))
+            f.write(index)
+            self.data_file.seek(0)
+            while True:
+                chunk = self.data_file.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                f.write(chunk)
+        self.data_file.close()
+        os.replace(temp_path, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type:
+            self.data_file.close()
+        else:
+            self.close()
+
+
+class SnapshotReader:
+    """
+    Memory-mapped snapshot reader that decodes only the sections asked for
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, 'rb')
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            raise ValueError(f"Empty snapshot file: {path}")
+
+        magic, index_length = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Not an ArchiQ snapshot: {path}")
+
+        index = json.loads(self.map[HEADER.size:HEADER.size + index_length])
+        self.data_start = HEADER.size + index_length
+        self.created_at = index.get('created_at')
+        self.metadata = index.get('metadata', {})
+        self.sections = index.get('sections', {})
+
+    @property
+    def resource_types(self):
+        return list(self.sections)
+
+    def count(self, resource_type: str):
+        section = self.sections.get(resource_type)
+        return section['count'] if section else 0
+
+    def iter_resources(self, resource_type: str):
+        """Yield resources of one type, decompressing the section in small chunks"""
+        section = self.sections.get(resource_type)
+        if not section:
+            return
+
+        start = self.data_start + section['offset']
+        end = start + section['length']
+        decompressor = zlib.decompressobj()
+        pending = b''
+        for position in range(start, end, CHUNK_SIZE):
+            data = self.map[position:min(position + CHUNK_SIZE, end)]
+            while data:
+                # Bound decompressed output per step so highly compressible sections stay small
+                pending += decompressor.decompress(data, CHUNK_SIZE)
+                data = decompressor.unconsumed_tail
+                *lines, pending = pending.split(b'\n')
+                for line in lines:
+                    yield json.loads(line)
+
+        pending += decompressor.flush()
+        for line in pending.split(b'\n'):
+            if line:
+                yield json.loads(line)
+
+    def load(self, resource_type: str):
+        return list(self.iter_resources(resource_type))
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,50 @@
+from datetime import datetime
+
+import pytest
+
+from middleware.scheduler import CronSchedule
+
+
+def test_single_value_with_step_runs_to_field_max():
+    assert CronSchedule('5/10 * * * *').minutes == {5, 15, 25, 35, 45, 55}
+
+
+def test_range_with_step_and_list():
+    schedule = CronSchedule('0 1-9/4,12 * * *')
+    assert schedule.hours == {1, 5, 9, 12}
+
+
+def test_weekday_seven_is_sunday():
+    assert CronSchedule('0 0 * * 7').weekdays == {0}
+    assert CronSchedule('0 0 * * 5-7').weekdays == {0, 5, 6}
+
+
+def test_weekday_star_covers_the_week_once():
+    assert CronSchedule('0 0 * * *').weekdays == set(range(7))
+
+
+@pytest.mark.parametrize('expression', [
+    '60 * * * *',
+    '* 24 * * *',
+    '* * 0 * *',
+    '* * * 13 *',
+    '* * * * 8',
+    '10-5 * * * *',
+    '*/0 * * * *',
+    '* * * *',
+])
+def test_invalid_expressions_are_rejected(expression):
+    with pytest.raises(ValueError):
+        CronSchedule(expression)
+
+
+def test_next_after_on_sunday_as_seven():
+    # 2026-10-17 is a Saturday; the next Sunday 03:30 is the 18th
+    schedule = CronSchedule('30 3 * * 7')
+    assert schedule.next_after(datetime(2026, 10, 17, 12, 0)) == datetime(2026, 10, 18, 3, 30)
+
+
+def test_day_of_month_or_weekday_when_both_restricted():
+    # Either the 1st or a Monday; 2026-10-19 is a Monday
+    schedule = CronSchedule('0 9 1 * 1')
+    assert schedule.next_after(datetime(2026, 10, 17, 0, 0)) == datetime(2026, 10, 19, 9, 0)
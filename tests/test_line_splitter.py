@@ -0,0 +1,52 @@
+from middleware.amazon_q_hook import IncrementalLineSplitter, QChatInteractiveSession
+
+
+def test_crlf_split_across_reads_keeps_line():
+    splitter = IncrementalLineSplitter()
+    assert splitter.feed(b'foo\r') == []
+    assert splitter.feed(b'\n') == ['foo']
+
+
+def test_crlf_in_one_read():
+    splitter = IncrementalLineSplitter()
+    assert splitter.feed(b'foo\r\nbar\r\n') == ['foo', 'bar']
+
+
+def test_redraw_keeps_last_visible_text():
+    splitter = IncrementalLineSplitter()
+    assert splitter.feed(b'\xe2\xa0\x8b Thinking\r') == []
+    assert splitter.feed(b'          \ranswer\r') == []
+    assert splitter.feed(b'\n') == ['answer']
+
+
+def test_multibyte_character_split_across_reads():
+    splitter = IncrementalLineSplitter()
+    data = '한국어\n'.encode('utf-8')
+    assert splitter.feed(data[:4]) == []
+    assert splitter.feed(data[4:]) == ['한국어']
+
+
+def test_flush_returns_unterminated_line():
+    splitter = IncrementalLineSplitter()
+    splitter.feed(b'partial\r')
+    assert splitter.flush() == ['partial']
+
+
+def test_clean_line_strips_csi_sequences():
+    session = QChatInteractiveSession()
+    assert session._clean_line('\x1b[?25l\x1b[1;32mdone\x1b[0m\x1b[2K') == 'done'
+    assert session._clean_line('\x1b[38;5;208mwarn\x1b[39m \x1b[3Gnext') == 'warn next'
+
+
+def test_clean_line_strips_osc_sequences():
+    session = QChatInteractiveSession()
+    assert session._clean_line('\x1b]0;qchat\x07answer') == 'answer'
+    link = '\x1b]8;;https://example.com\x1b\\docs\x1b]8;;\x1b\\'
+    assert session._clean_line(f'see {link}') == 'see docs'
+
+
+def test_split_then_clean_pty_output():
+    splitter = IncrementalLineSplitter()
+    session = QChatInteractiveSession()
+    lines = splitter.feed(b'\x1b[?2004h\x1b]0;qchat\x07\xe2\xa0\x8b Thinking\r\x1b[2K\x1b[32m> answer\x1b[0m\r\n')
+    assert [session._clean_line(line) for line in lines] == ['> answer']